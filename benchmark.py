@@ -0,0 +1,450 @@
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import copy
+import json
+import multiprocessing
+import os
+import platform
+import random
+import sys
+import time
+from engine import (BORDER, EMPTY, AlphaBetaBot, BatchPlayouts, Board,
+                    Difficulty, MCTSBot, MinMaxBot, ParallelSearch,
+                    TranspositionTable)
+
+# DIRECTORY :: POSITIONS
+
+# microseconds per call by table rows: legal mask, play + undo, score,
+# check_budgets fails when a size goes over (see README.md)
+PERFORMANCE_BUDGETS = {
+    7: (50, 50, 150),
+    9: (50, 50, 200),
+    10: (75, 50, 250),
+    12: (100, 50, 400),
+    18: (150, 50, 1000),
+}
+
+
+# positions recorded from seeded random games, every `step` moves
+def record_positions(size, games=20, moves=120, step=10, seed=0):
+    rng = random.Random(seed)
+    positions = []
+    for _ in range(games):
+        board = Board(size)
+        for move in range(moves):
+            legal_moves = board.legal_moves()
+            if not legal_moves:
+                break
+            board.play(rng.choice(legal_moves))
+            if move % step == step - 1:
+                positions.append(board.copy())
+    return positions
+
+
+# DIRECTORY :: REFERENCES
+
+
+# what Table.is_valid_move used to do: copy everything and try the move
+def is_legal_by_copy(board, p, color=None):
+    if board.points[p] != EMPTY:
+        return False
+    trial = copy.deepcopy(board)
+    trial.play(p, color)
+    return trial.get_liberty_count(p) > 0 and trial.hash not in board.history
+
+
+# what Table.calculate_scores used to do: a recursive flood fill with sets
+def territory_by_recursion(board):
+    vertices = {(0, 0), (0, board.size - 1), (board.size - 1, 0),
+                (board.size - 1, board.size - 1)}
+
+    def visit_area(p, visited, colors, borders):
+        visited.add(p)
+        i, j = board.coords(p)
+        if (i, j) not in vertices:
+            for edge, border in ((i == 0, 'bottom'),
+                                 (i == board.size - 1, 'top'),
+                                 (j == 0, 'left'),
+                                 (j == board.size - 1, 'right')):
+                if edge:
+                    borders.add(border)
+        for d in board.offsets:
+            c = board.points[p + d]
+            if c == EMPTY:
+                if p + d not in visited:
+                    visit_area(p + d, visited, colors, borders)
+            elif c != BORDER:
+                colors.add(c)
+
+    owners = list(board.points)
+    for p in board.all_points:
+        if owners[p] == EMPTY:
+            visited, colors, borders = set(), set(), set()
+            visit_area(p, visited, colors, borders)
+            owner = next(iter(colors)) if len(colors) == 1 and len(
+                borders) <= 1 else BORDER  # marks the area as visited
+            for q in visited:
+                owners[q] = owner
+    return [EMPTY if owner == BORDER and board.points[p] == EMPTY else owner
+            for p, owner in enumerate(owners)]
+
+# DIRECTORY :: CHECKS
+
+
+# legal moves, move application and scoring against PERFORMANCE_BUDGETS,
+# timed on positions from the whole length of random games
+def check_budgets(repeat=10):
+    for rows, budget in PERFORMANCE_BUDGETS.items():
+        positions = record_positions(rows + 1,
+                                     games=5,
+                                     moves=3 * rows * rows // 2,
+                                     step=2 * rows)
+        start = time.perf_counter()
+        for board in positions:
+            for _ in range(repeat):
+                board.get_legal_mask()
+        mask_time = (time.perf_counter() - start) / (repeat * len(positions))
+
+        moves = 0
+        start = time.perf_counter()
+        for board in positions:
+            for p in board.legal_moves():
+                board.play(p)
+                board.undo()
+                moves += 1
+        play_time = (time.perf_counter() - start) / moves
+
+        start = time.perf_counter()
+        for board in positions:
+            for _ in range(repeat):
+                board.score()
+        score_time = (time.perf_counter() - start) / (repeat * len(positions))
+
+        times = tuple(t * 1e6 for t in (mask_time, play_time, score_time))
+        print(f"budget {rows}x{rows}: "
+              f"legal mask {times[0]:.0f}/{budget[0]} us, "
+              f"play {times[1]:.0f}/{budget[1]} us, "
+              f"score {times[2]:.0f}/{budget[2]} us")
+        for name, spent, limit in zip(('legal mask', 'play', 'score'), times,
+                                      budget):
+            assert spent <= limit, \
+                f"{rows}x{rows} {name} over budget: {spent:.0f} > {limit} us"
+
+# DIRECTORY :: BENCHMARKS
+
+
+def time_calls(function, positions):
+    calls = 0
+    start = time.perf_counter()
+    for board in positions:
+        for p in board.all_points:
+            function(board, p)
+        calls += len(board.all_points)
+    return (time.perf_counter() - start) / calls
+
+
+def benchmark_legality(size=11):
+    positions = record_positions(size)
+    fast = time_calls(Board.is_legal, positions)
+    slow = time_calls(is_legal_by_copy, positions[:len(positions) // 10])
+    print(f"legality {size - 1}x{size - 1}: {fast * 1e6:.2f} us/call, "
+          f"copy {slow * 1e6:.2f} us/call, speedup {slow / fast:.0f}x")
+    return slow / fast
+
+
+def benchmark_territory(size=19):
+    positions = record_positions(size, games=10, moves=400, step=40)
+    start = time.perf_counter()
+    for board in positions:
+        board.score()
+    score_time = (time.perf_counter() - start) / len(positions)
+    start = time.perf_counter()
+    for board in positions:
+        territory_by_recursion(board)
+    recursion_time = (time.perf_counter() - start) / len(positions)
+    print(f"territory {size - 1}x{size - 1}: {score_time * 1e6:.0f} us/score, "
+          f"recursive {recursion_time * 1e6:.0f} us/board")
+
+
+def benchmark_legal_mask(size=19):
+    positions = record_positions(size, moves=400, step=40)
+    start = time.perf_counter()
+    for board in positions:
+        board.get_legal_mask()
+    mask_time = (time.perf_counter() - start) / len(positions)
+    start = time.perf_counter()
+    for board in positions:
+        [p for p in board.all_points if board.is_legal(p)]
+    scan_time = (time.perf_counter() - start) / len(positions)
+    print(f"legal mask {size - 1}x{size - 1}: {mask_time * 1e6:.1f} us/board, "
+          f"scalar scan {scan_time * 1e6:.1f} us/board")
+
+
+def print_bot_stats(name, size, all_stats):
+    nodes = sum(stats['nodes'] for stats in all_stats)
+    elapsed = sum(stats['time'] for stats in all_stats)
+    depth = sum(stats['depth'] for stats in all_stats) / len(all_stats)
+    print(f"{name} {size - 1}x{size - 1}: {nodes / elapsed:.0f} nodes/s, "
+          f"depth {depth:.1f}, {elapsed / len(all_stats):.2f} s/move")
+
+
+# MinMaxBot against AlphaBetaBot given the same time on the same positions
+def benchmark_bots(size=8, difficulty=Difficulty.EASY):
+    min_max_stats = []
+    alpha_beta_stats = []
+    for board in record_positions(size, games=2, moves=30, step=15):
+        min_max_stats.append(
+            MinMaxBot(board, difficulty=difficulty).get_stats())
+        alpha_beta_stats.append(
+            AlphaBetaBot(board,
+                         time_limit=min_max_stats[-1]['time'],
+                         max_depth=64).get_stats())
+    print_bot_stats('MinMaxBot', size, min_max_stats)
+    print_bot_stats('AlphaBetaBot', size, alpha_beta_stats)
+
+
+# nodes searched to a fixed depth without and with a transposition table
+def benchmark_transpositions(size_mb=16):
+    for size, bot_class, depth in ((8, MinMaxBot, 3), (8, AlphaBetaBot, 4),
+                                   (10, AlphaBetaBot, 3)):
+        nodes = [0, 0]
+        evaluations = [0, 0]
+        for board in record_positions(size, games=2, moves=30, step=15):
+            for k, table_size in enumerate((0, size_mb)):
+                table = TranspositionTable(table_size)
+                if bot_class == MinMaxBot:
+                    bot = MinMaxBot(board,
+                                    transposition_table=table,
+                                    time_limit=3600,
+                                    max_depth=depth)
+                else:
+                    bot = AlphaBetaBot(board,
+                                       time_limit=3600,
+                                       max_depth=depth,
+                                       transposition_table=table)
+                nodes[k] += bot.get_stats()['nodes']
+                evaluations[k] += bot.get_stats()['evaluations']
+        print(f"{bot_class.__name__} {size - 1}x{size - 1} depth {depth}: "
+              f"nodes {nodes[0]} -> {nodes[1]} "
+              f"({1 - nodes[1] / nodes[0]:.0%} less), "
+              f"evaluations {evaluations[0]} -> {evaluations[1]} "
+              f"({1 - evaluations[1] / evaluations[0]:.0%} less)")
+
+
+def benchmark_playouts(size=10, time_limit=3):
+    bot = MCTSBot(Board(size), time_limit=time_limit, seed=0)
+    print(f"MCTSBot {size - 1}x{size - 1}: "
+          f"{bot.get_stats()['playouts_per_second']:.0f} playouts/s")
+
+
+# the same position played out by K boards in lockstep
+def benchmark_batch_playouts(size=10, counts=(256, 1024, 4096)):
+    board = record_positions(size, games=1, moves=20, step=20)[0]
+    for count in counts:
+        start = time.perf_counter()
+        BatchPlayouts(board, count, seed=0).run()
+        elapsed = time.perf_counter() - start
+        print(f"BatchPlayouts {size - 1}x{size - 1}: {count} playouts in "
+              f"{elapsed:.2f} s, {count / elapsed:.0f} playouts/s")
+
+
+# time to a fixed depth and nodes per second from 1 to all the cores
+def benchmark_parallel(size=10, depth=3, max_workers=None):
+    max_workers = max_workers or os.cpu_count()
+    positions = record_positions(size, games=1, moves=40, step=20)
+    worker_counts = sorted(
+        set([1 << k
+             for k in range(max_workers.bit_length())] + [max_workers]))
+    base_time = None
+    for workers in worker_counts:
+        with ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context('spawn')) as executor:
+            ParallelSearch(positions[0], executor, workers, 1)  # start workers
+            nodes = elapsed = 0
+            for board in positions:
+                search = ParallelSearch(board, executor, workers, depth)
+                nodes += search.nodes
+                elapsed += search.elapsed
+        base_time = base_time or elapsed
+        print(f"parallel {size - 1}x{size - 1} depth {depth}, "
+              f"{workers} workers: {elapsed / len(positions):.2f} s/move, "
+              f"{nodes / elapsed:.0f} nodes/s, "
+              f"speedup {base_time / elapsed:.1f}x")
+
+
+# DIRECTORY :: SUITE
+
+SUITE_ROWS = (7, 9, 10, 12, 18)
+BASELINE_PATH = 'benchmark_baseline.json'
+
+
+# best of `rounds` runs of function(), in seconds per operation
+def time_best(function, operations, rounds):
+    best = float('inf')
+    for _ in range(rounds):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best / operations
+
+
+def play_random_game(size, seed):
+    rng = random.Random(seed)
+    board = Board(size)
+    for _ in range(3 * len(board.all_points)):
+        legal_moves = board.legal_moves()
+        if not legal_moves:
+            break
+        board.play(rng.choice(legal_moves))
+    board.score()
+
+
+# (function, operations it runs) by name for one table size, every position,
+# game and search is seeded so two runs time the same work
+def get_suite(rows):
+    size = rows + 1
+    positions = record_positions(size,
+                                 games=4,
+                                 moves=3 * rows * rows // 2,
+                                 step=2 * rows)
+    moves = [(board, p) for board in positions for p in board.all_points]
+    legal_moves = [(board, p) for board in positions
+                   for p in board.legal_moves()]
+
+    def play_undo():
+        for board, p in legal_moves:
+            board.play(p)
+            board.undo()
+
+    def search():
+        for board in positions[::8]:
+            AlphaBetaBot(board,
+                         max_depth=2,
+                         time_limit=float('inf'),
+                         transposition_table=TranspositionTable(1))
+
+    return {
+        'legality': (lambda: [board.is_legal(p) for board, p in moves],
+                     len(moves)),
+        'legal mask': (lambda: [board.get_legal_mask() for board in positions],
+                       len(positions)),
+        'play undo': (play_undo, len(legal_moves)),
+        'score': (lambda: [board.score() for board in positions],
+                  len(positions)),
+        'random game':
+        (lambda: [play_random_game(size, seed) for seed in range(2)], 2),
+        'bot move': (search, len(positions[::8])),
+    }
+
+
+# seconds per operation by "<name> <rows>x<rows>" for all of them or only
+# `keys`, the best over `passes` runs of the suite so a slow spell of the
+# machine only costs the benchmarks it hit in one pass
+def run_suite(passes=3, rounds=3, keys=None):
+    suites = {
+        rows: get_suite(rows)
+        for rows in SUITE_ROWS
+        if keys is None or any(key.endswith(f" {rows}x{rows}") for key in keys)
+    }
+    results = {}
+    for _ in range(passes):
+        for rows, suite in suites.items():
+            for name, (function, operations) in suite.items():
+                key = f"{name} {rows}x{rows}"
+                if keys is not None and key not in keys:
+                    continue
+                results[key] = min(results.get(key, float('inf')),
+                                   time_best(function, operations, rounds))
+    return results
+
+
+def save_results(results, path):
+    with open(path, 'w') as f:
+        json.dump(
+            {
+                'python': platform.python_version(),
+                'machine': platform.machine(),
+                'results': results,
+            },
+            f,
+            indent=2)
+
+
+def get_regressions(results, baseline, threshold):
+    return [
+        name for name, seconds in results.items()
+        if name in baseline and seconds > baseline[name] * (1 + threshold)
+    ]
+
+
+def print_comparison(results, baseline, regressions):
+    print(f"{'benchmark':<20} {'baseline':>12} {'current':>12} {'change':>8}")
+    for name, seconds in results.items():
+        if name not in baseline:
+            print(f"{name:<20} {'-':>12} {seconds * 1e6:>10.1f}us")
+            continue
+        flag = ' REGRESSION' if name in regressions else ''
+        print(f"{name:<20} {baseline[name] * 1e6:>10.1f}us "
+              f"{seconds * 1e6:>10.1f}us "
+              f"{seconds / baseline[name] - 1:>+8.0%}{flag}")
+
+
+# the suite against the baseline, benchmarks over the threshold are timed
+# again up to `retries` times before they count as regressions
+def compare_with_baseline(results, baseline, threshold, retries=3):
+    regressions = get_regressions(results, baseline, threshold)
+    for _ in range(retries):
+        if not regressions:
+            break
+        for name, seconds in run_suite(keys=regressions).items():
+            results[name] = min(results[name], seconds)
+        regressions = get_regressions(results, baseline, threshold)
+    print_comparison(results, baseline, regressions)
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--suite',
+                        action='store_true',
+                        help="only run the timed suite")
+    parser.add_argument('--output', help="save the suite results as JSON")
+    parser.add_argument('--baseline',
+                        default=BASELINE_PATH,
+                        help="suite results to compare against, "
+                        "recorded by the first run")
+    parser.add_argument('--threshold',
+                        type=float,
+                        default=0.3,
+                        help="allowed slowdown, 0.3 is 30%%")
+    args = parser.parse_args()
+
+    if args.suite:
+        results = run_suite()
+        regressions = []
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f)['results']
+            regressions = compare_with_baseline(results, baseline,
+                                                args.threshold)
+        else:
+            # timings only compare on the machine that made them, the first
+            # run records the baseline there
+            for name, seconds in results.items():
+                print(f"{name:<20} {seconds * 1e6:>10.1f}us")
+            save_results(results, args.baseline)
+            print(f"no baseline, recorded this run as {args.baseline}")
+        if args.output:
+            save_results(results, args.output)
+        sys.exit(1 if regressions else 0)
+
+    check_budgets()
+    benchmark_legality()
+    benchmark_legal_mask()
+    benchmark_territory()
+    benchmark_bots()
+    benchmark_transpositions()
+    benchmark_playouts()
+    benchmark_batch_playouts()
+    benchmark_parallel()
@@ -0,0 +1,1849 @@
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from enum import Enum
+import math
+import multiprocessing
+import multiprocessing.util
+import os
+import random
+import signal
+import time
+
+try:
+    import numpy as np
+except ImportError:  # only the batch helpers need numpy
+    np = None
+
+# DIRECTORY :: CONSTANTS
+
+# point contents, values match StoneType
+EMPTY = 0
+BLACK = 1
+WHITE = 2
+BORDER = 3
+PASS = -1
+
+
+# DIRECTORY :: ENUMS
+class Algorithm(Enum):
+    MIN_MAX = 0
+    ALPHA_BETA = 1
+    MCTS = 2
+
+
+class Border(Enum):
+    LEFT = 0
+    TOP = 1
+    RIGHT = 2
+    BOTTOM = 4
+
+
+class Difficulty(Enum):
+    EASY = 0
+    MEDIUM = 1
+    HARD = 2
+
+
+class TableDimension(Enum):
+    DIM7x7 = 0
+    DIM9x9 = 1
+    DIM10x10 = 2
+    DIM12x12 = 3
+    DIM18x18 = 4
+
+
+class Moves(Enum):
+    CNT50 = 0
+    CNT100 = 1
+    CNT200 = 2
+
+
+class GameType(Enum):
+    PVP = 0
+    PVA = 1
+    AVA = 2
+
+
+class StoneType(Enum):
+    EMPTY = 0
+    BLACK = 1
+    WHITE = 2
+
+
+class HeuristicType(Enum):
+    H1 = 0  # eyes
+    H2 = 1  # liberty points
+
+
+class NodeLevel(Enum):
+    MIN = 0
+    MAX = 1
+
+
+class BoundType(Enum):
+    EXACT = 0
+    LOWER = 1
+    UPPER = 2
+
+
+# DIRECTORY :: ENGINE
+
+
+def get_opponent(color):
+    return BLACK + WHITE - color
+
+
+zobrist_keys_by_length = {}
+
+
+def get_mask_points(mask):
+    points = []
+    while mask:
+        low = mask & -mask
+        points.append(low.bit_length() - 1)
+        mask ^= low
+    return points
+
+
+# 64 bit keys indexed by [color][point], the same for every process
+def get_zobrist_keys(length):
+    if length not in zobrist_keys_by_length:
+        rng = random.Random(length)
+        zobrist_keys_by_length[length] = [[0] * length] + [[
+            rng.getrandbits(64) for _ in range(length)
+        ] for _ in (BLACK, WHITE)]
+    return zobrist_keys_by_length[length]
+
+
+# xor'ed into the position hash when white is to move
+TURN_KEYS = (0, 0, random.Random(-1).getrandbits(64))
+
+
+# point of every key, indexed by [color][key]
+def get_zobrist_points(keys):
+    return [{key: p for p, key in enumerate(color_keys)} for color_keys in keys]
+
+
+edge_bits_by_size = {}
+
+
+# bit of the border every point touches, the four vertices touch none
+def get_edge_bits(size):
+    if size not in edge_bits_by_size:
+        stride = size + 2
+        edge_bits = [0] * (stride * stride)
+        for i in range(size):
+            for j in range(size):
+                if i in (0, size - 1) and j in (0, size - 1):
+                    continue
+                bits = 0
+                if i == 0:
+                    bits |= 1 << Border.BOTTOM.value
+                if i == size - 1:
+                    bits |= 1 << Border.TOP.value
+                if j == 0:
+                    bits |= 1 << Border.LEFT.value
+                if j == size - 1:
+                    bits |= 1 << Border.RIGHT.value
+                edge_bits[(i + 1) * stride + j + 1] = bits
+        edge_bits_by_size[size] = edge_bits
+    return edge_bits_by_size[size]
+
+
+# Board of size x size points stored in a flat array with a sentinel border.
+# Point (i, j) lives at (i + 1) * stride + j + 1, (0, 0) is the left bottom corner.
+class Board:
+    def __init__(self, size):
+        self.size = size
+        self.stride = size + 2
+        self.offsets = (-self.stride, 1, self.stride, -1)
+
+        self.points = array('b', [BORDER] * (self.stride * self.stride))
+        self.all_points = tuple(
+            self.point(i, j) for i in range(size) for j in range(size))
+        for p in self.all_points:
+            self.points[p] = EMPTY
+
+        # groups are kept in a union-find over the points, the stones of a group
+        # are linked in a circular list and liberties are bitsets per root
+        self.parent = array('i', range(len(self.points)))
+        self.group_size = array('i', [1] * len(self.points))
+        self.next_stone = array('i', range(len(self.points)))
+        self.liberties = [0] * len(self.points)
+        self.group_hash = [0] * len(self.points)  # xor of the stone keys
+        self.roots = set()
+        self.empty_mask = sum(1 << p for p in self.all_points)
+        self.stone_count = 0
+
+        # positional superko: a move can't recreate any earlier position
+        self.zobrist_keys = get_zobrist_keys(len(self.points))
+        self.zobrist_points = get_zobrist_points(self.zobrist_keys)
+        self.hash = 0
+        self.history = {self.hash}
+        # positions in history by number of stones, a move that captures
+        # nothing can only repeat a position with one more stone
+        self.history_by_size = [set() for _ in range(len(self.all_points) + 2)]
+        self.history_by_size[0].add(self.hash)
+
+        self.turn = BLACK
+        self.captures = [0, 0, 0]  # indexed by color
+        self.undo_stack = []
+
+        # heuristic features by color, kept by play / undo once tracked
+        self.eyes = None  # empty points with all four neighbors of the color
+        self.liberty_points = None  # empty points next to the color
+
+    # compact picklable state: stones, side to move, captures and history
+    def get_snapshot(self):
+        history = tuple((stone_count, h)
+                        for stone_count, hashes in enumerate(self.history_by_size)
+                        for h in hashes)
+        return (self.size, bytes(self.points), self.turn,
+                tuple(self.captures), history)
+
+    def from_snapshot(snapshot):
+        size, points, turn, captures, history = snapshot
+        board = Board(size)
+        board.points = array('b', points)
+        board.turn = turn
+        board.captures = list(captures)
+        board.history.clear()
+        board.history_by_size[0].clear()
+        for stone_count, h in history:
+            board.history.add(h)
+            board.history_by_size[stone_count].add(h)
+        board.rebuild_groups()
+        return board
+
+    # groups, masks and hash from the point contents alone
+    def rebuild_groups(self):
+        points = self.points
+        stones = [p for p in self.all_points if points[p] != EMPTY]
+        for p in stones:
+            self.group_hash[p] = self.zobrist_keys[points[p]][p]
+            self.hash ^= self.group_hash[p]
+            self.empty_mask ^= 1 << p
+            self.roots.add(p)
+            for d in self.offsets:
+                if points[p + d] == EMPTY:
+                    self.liberties[p] |= 1 << (p + d)
+        for p in stones:
+            for d in self.offsets:
+                q = p + d
+                if points[q] == points[p] and self.find(p) != self.find(q):
+                    self.union(self.find(p), self.find(q), [], [])
+        self.stone_count = len(stones)
+
+    def point(self, i, j):
+        return (i + 1) * self.stride + j + 1
+
+    def coords(self, p):
+        i, j = divmod(p, self.stride)
+        return i - 1, j - 1
+
+    def get(self, i, j):
+        return self.points[self.point(i, j)]
+
+    def copy(self):
+        board = Board.__new__(Board)
+        board.__dict__.update(self.__dict__)
+        board.points = array('b', self.points)
+        board.parent = array('i', self.parent)
+        board.group_size = array('i', self.group_size)
+        board.next_stone = array('i', self.next_stone)
+        board.liberties = list(self.liberties)
+        board.group_hash = list(self.group_hash)
+        board.history = set(self.history)
+        board.history_by_size = [set(s) for s in self.history_by_size]
+        board.roots = set(self.roots)
+        board.captures = list(self.captures)
+        board.undo_stack = list(self.undo_stack)
+        if self.eyes is not None:
+            board.eyes = list(self.eyes)
+            board.liberty_points = list(self.liberty_points)
+        return board
+
+    def find(self, p):
+        parent = self.parent
+        while parent[p] != p:
+            parent[p] = parent[parent[p]]
+            p = parent[p]
+        return p
+
+    def get_group_stones(self, p):
+        stones = [p]
+        q = self.next_stone[p]
+        while q != p:
+            stones.append(q)
+            q = self.next_stone[q]
+        return stones
+
+    def get_liberty_count(self, p):
+        return self.liberties[self.find(p)].bit_count()
+
+    def track_features(self):
+        if self.eyes is not None:
+            return
+        self.eyes, self.liberty_points = self.get_features()
+
+    # (eyes, liberty points) by color counted over all points, tracking stays
+    # as it was
+    def get_features(self):
+        eyes = [0, 0, 0]
+        liberty_points = [0, 0, 0]
+        for p in self.all_points:
+            self.count_features(p, 1, eyes, liberty_points)
+        return eyes, liberty_points
+
+    # the board a search plays and undoes on with the features tracked: the
+    # board itself once it tracks them, else a copy so tracking is never
+    # turned on behind the caller
+    def get_search_board(self):
+        if self.eyes is not None:
+            return self
+        board = self.copy()
+        board.track_features()
+        return board
+
+    # adds sign times the features of p to the lists, only empty points
+    # have any
+    def count_features(self, p, sign, eyes, liberty_points):
+        points = self.points
+        if points[p] != EMPTY:
+            return
+        a = points[p - self.stride]
+        b = points[p + 1]
+        c = points[p + self.stride]
+        d = points[p - 1]
+        if a == b == c == d and a != EMPTY:
+            eyes[a] += sign
+        if a == BLACK or b == BLACK or c == BLACK or d == BLACK:
+            liberty_points[BLACK] += sign
+        if a == WHITE or b == WHITE or c == WHITE or d == WHITE:
+            liberty_points[WHITE] += sign
+
+    # a stone only changes the features of its point and the four around it
+    def set_point(self, p, value):
+        eyes = self.eyes
+        if eyes is None:
+            self.points[p] = value
+            return
+        liberty_points = self.liberty_points
+        around = (p, p - self.stride, p + 1, p + self.stride, p - 1)
+        for q in around:
+            self.count_features(q, -1, eyes, liberty_points)
+        self.points[p] = value
+        for q in around:
+            self.count_features(q, 1, eyes, liberty_points)
+
+    # position and side to move, key for search caches
+    def get_key(self):
+        return self.hash ^ TURN_KEYS[self.turn]
+
+    def compute_hash(self):
+        h = 0
+        for p in self.all_points:
+            h ^= self.zobrist_keys[self.points[p]][p]
+        return h
+
+    # decided only by the liberty bitsets of the four neighbor groups
+    # and the hash of the resulting position
+    def is_legal(self, p, color=None):
+        if color is None:
+            color = self.turn
+        points = self.points
+        if points[p] != EMPTY:
+            return False
+
+        bit = 1 << p
+        has_liberty = False
+        new_hash = self.hash ^ self.zobrist_keys[color][p]
+        captured_roots = ()
+        for d in self.offsets:
+            q = p + d
+            c = points[q]
+            if c == EMPTY:
+                has_liberty = True
+            elif c == BORDER:
+                continue
+            else:
+                root = self.find(q)
+                liberties = self.liberties[root]
+                if c == color:
+                    if liberties & ~bit:
+                        has_liberty = True  # connects to a group with other liberties
+                elif liberties == bit and root not in captured_roots:
+                    has_liberty = True  # captures the neighbor group
+                    captured_roots += (root, )
+                    new_hash ^= self.group_hash[root]
+
+        return has_liberty and new_hash not in self.history
+
+    # bitboard of all the legal moves, same answers as is_legal
+    def get_legal_mask(self, color=None):
+        if color is None:
+            color = self.turn
+        empty = self.empty_mask
+        stride = self.stride
+        mask = ((empty << 1) | (empty >> 1) | (empty << stride) |
+                (empty >> stride)) & empty  # has an empty neighbor
+
+        captures = 0
+        points = self.points
+        liberties = self.liberties
+        for root in self.roots:
+            group_liberties = liberties[root]
+            if group_liberties & (group_liberties - 1) == 0:  # in atari
+                if points[root] != color:
+                    captures |= group_liberties
+            elif points[root] == color:
+                mask |= group_liberties
+
+        for p in get_mask_points(captures):
+            if not self.is_legal(p, color):
+                captures ^= 1 << p
+        mask &= ~captures
+        zobrist_points = self.zobrist_points[color]
+        for h in self.history_by_size[self.stone_count + 1]:
+            p = zobrist_points.get(h ^ self.hash)
+            if p is not None:
+                mask &= ~(1 << p)
+        return mask | captures
+
+    def has_legal_move(self, color=None):
+        return self.get_legal_mask(color) != 0
+
+    def legal_moves(self, color=None):
+        return get_mask_points(self.get_legal_mask(color))
+
+    # assert is a legal move calling (is_legal) first
+    # returns the number of captured stones
+    def play(self, p, color=None):
+        if p == PASS:
+            self.pass_move()
+            return 0
+        if color is None:
+            color = self.turn
+        opponent = get_opponent(color)
+        points = self.points
+        liberties = self.liberties
+
+        # everything undo needs to restore the exact prior state
+        old_hash = self.hash
+        old_point_state = (liberties[p], self.group_hash[p])
+        merges = []
+        changes = []  # (root, previous liberties)
+        captured_groups = []
+
+        bit = 1 << p
+        self.set_point(p, color)
+        self.empty_mask ^= bit
+        root = p
+        liberties[p] = 0
+        self.group_hash[p] = self.zobrist_keys[color][p]
+        self.hash ^= self.group_hash[p]
+        for d in self.offsets:
+            q = p + d
+            c = points[q]
+            if c == EMPTY:
+                liberties[root] |= 1 << q
+            elif c == color:
+                neighbor_root = self.find(q)
+                if neighbor_root != root:
+                    root = self.union(root, neighbor_root, merges, changes)
+            elif c == opponent:
+                neighbor_root = self.find(q)
+                changes.append((neighbor_root, liberties[neighbor_root]))
+                liberties[neighbor_root] &= ~bit
+        liberties[root] &= ~bit
+        self.roots.add(root)
+
+        captured = 0
+        for d in self.offsets:
+            q = p + d
+            if points[q] == opponent:
+                neighbor_root = self.find(q)
+                if not liberties[neighbor_root]:
+                    captured += self.remove_group(neighbor_root, color,
+                                                  captured_groups, changes)
+
+        self.stone_count += 1 - captured
+        is_new_position = self.hash not in self.history
+        if is_new_position:
+            self.history.add(self.hash)
+            self.history_by_size[self.stone_count].add(self.hash)
+        self.captures[color] += captured
+        self.turn = opponent
+        self.undo_stack.append(
+            (p, color, captured, old_hash, old_point_state, is_new_position,
+             merges, changes, captured_groups))
+        return captured
+
+    def pass_move(self):
+        self.undo_stack.append((PASS, self.turn))
+        self.turn = get_opponent(self.turn)
+
+    # take back the last play or pass
+    def undo(self):
+        record = self.undo_stack.pop()
+        p, color = record[0], record[1]
+        self.turn = color
+        if p == PASS:
+            return
+
+        (_, _, captured, old_hash, old_point_state, is_new_position, merges,
+         changes, captured_groups) = record
+        parent = self.parent
+        next_stone = self.next_stone
+
+        self.captures[color] -= captured
+        if is_new_position:
+            self.history.discard(self.hash)
+            self.history_by_size[self.stone_count].discard(self.hash)
+        self.stone_count -= 1 - captured
+        self.hash = old_hash
+
+        opponent = get_opponent(color)
+        for root, stones in reversed(captured_groups):
+            for k, stone in enumerate(stones):
+                self.set_point(stone, opponent)
+                parent[stone] = root
+                next_stone[stone] = stones[(k + 1) % len(stones)]
+                self.empty_mask ^= 1 << stone
+            self.group_size[root] = len(stones)
+            self.roots.add(root)
+
+        for root, liberties in reversed(changes):
+            self.liberties[root] = liberties
+
+        for a, b, size, group_hash in reversed(merges):
+            next_stone[a], next_stone[b] = next_stone[b], next_stone[a]
+            self.group_size[a] -= size
+            self.group_size[b] = size
+            self.group_hash[a] = group_hash
+            for stone in self.get_group_stones(b):
+                parent[stone] = b
+            self.roots.add(b)
+
+        self.roots.discard(p)
+        self.empty_mask |= 1 << p
+        self.set_point(p, EMPTY)
+        parent[p] = p
+        next_stone[p] = p
+        self.group_size[p] = 1
+        self.liberties[p], self.group_hash[p] = old_point_state
+
+    # union by size, returns the new root
+    def union(self, a, b, merges, changes):
+        if self.group_size[a] < self.group_size[b]:
+            a, b = b, a
+        merges.append((a, b, self.group_size[b], self.group_hash[a]))
+        changes.append((a, self.liberties[a]))
+        self.roots.discard(b)
+        self.parent[b] = a
+        self.group_size[a] += self.group_size[b]
+        self.liberties[a] |= self.liberties[b]
+        self.group_hash[a] ^= self.group_hash[b]
+        next_stone = self.next_stone
+        next_stone[a], next_stone[b] = next_stone[b], next_stone[a]
+        return a
+
+    # captured stones become liberties of the neighbor groups of `color`
+    def remove_group(self, root, color, captured_groups, changes):
+        points = self.points
+        stones = self.get_group_stones(root)
+        captured_groups.append((root, stones))
+        self.roots.discard(root)
+        self.hash ^= self.group_hash[root]
+        for stone in stones:
+            self.set_point(stone, EMPTY)
+            self.empty_mask |= 1 << stone
+            self.parent[stone] = stone
+            self.group_size[stone] = 1
+            self.next_stone[stone] = stone
+        for stone in stones:
+            bit = 1 << stone
+            for d in self.offsets:
+                q = stone + d
+                if points[q] == color:
+                    neighbor_root = self.find(q)
+                    changes.append((neighbor_root, self.liberties[neighbor_root]))
+                    self.liberties[neighbor_root] |= bit
+        return len(stones)
+
+    # point contents with the owned empty areas filled by their owner color,
+    # an area is owned when it touches one color and at most one border
+    def territory(self):
+        points = self.points
+        offsets = self.offsets
+        edge_bits = get_edge_bits(self.size)
+        owners = list(points)
+        visited = bytearray(len(points))
+        for p in self.all_points:
+            if points[p] != EMPTY or visited[p]:
+                continue
+            visited[p] = 1
+            area = [p]
+            colors = 0
+            borders = 0
+            for q in area:  # grows while it is walked
+                borders |= edge_bits[q]
+                for d in offsets:
+                    r = q + d
+                    c = points[r]
+                    if c == EMPTY:
+                        if not visited[r]:
+                            visited[r] = 1
+                            area.append(r)
+                    elif c != BORDER:
+                        colors |= c
+            owned = colors == BLACK or colors == WHITE
+            if owned and borders & (borders - 1) == 0:  # one border at most
+                for q in area:
+                    owners[q] = colors
+        return owners
+
+    # area score (stones + territory) indexed by color
+    def score(self):
+        scores = [0, 0, 0]
+        owners = self.territory()
+        for p in self.all_points:
+            scores[owners[p]] += 1
+        return scores
+
+    def __str__(self):
+        text = ""
+        for i in range(self.size - 1, -1, -1):
+            text += ' '.join('.XO'[self.get(i, j)]
+                             for j in range(self.size)) + '\n'
+        return text
+
+
+# copy of a Board for random playouts: stones, groups, captures and hash with
+# a simple ko point, no history or undo records, moves are not taken back
+class PlayoutBoard:
+    def __init__(self, board):
+        self.size = board.size
+        self.stride = board.stride
+        self.offsets = board.offsets
+        self.all_points = board.all_points
+        self.points = array('b', board.points)
+        self.parent = array('i', board.parent)
+        self.group_size = array('i', board.group_size)
+        self.next_stone = array('i', board.next_stone)
+        self.liberties = list(board.liberties)
+        self.zobrist_keys = board.zobrist_keys
+        self.hash = board.hash
+        self.captures = list(board.captures)
+        self.turn = board.turn
+
+        # empty points in any order and the index of each one in the list
+        self.empty = get_mask_points(board.empty_mask)
+        self.empty_index = array('i', [0] * len(board.points))
+        for k, p in enumerate(self.empty):
+            self.empty_index[p] = k
+
+        # the last move played on the board may have taken a ko
+        self.ko = None
+        if board.undo_stack and board.undo_stack[-1][0] != PASS:
+            p, _, captured = board.undo_stack[-1][:3]
+            if captured == 1:
+                self.set_ko(p, board.undo_stack[-1][-1][0][1][0])
+
+    def find(self, p):
+        parent = self.parent
+        while parent[p] != p:
+            parent[p] = parent[parent[p]]
+            p = parent[p]
+        return p
+
+    # swaps the empty points at k and l of the list
+    def swap_empty(self, k, l):
+        empty = self.empty
+        p, q = empty[k], empty[l]
+        empty[k], empty[l] = q, p
+        self.empty_index[q] = k
+        self.empty_index[p] = l
+
+    # a lone stone that took a lone stone at q can be taken back right away
+    def set_ko(self, p, q):
+        root = self.find(p)
+        if self.group_size[root] == 1 and self.liberties[root] == 1 << q:
+            self.ko = q
+        else:
+            self.ko = None
+
+    # no suicide and no retaking the ko, from the neighbor liberty bitsets
+    def is_legal(self, p, color):
+        points = self.points
+        if points[p] != EMPTY or p == self.ko:
+            return False
+        bit = 1 << p
+        for d in self.offsets:
+            q = p + d
+            c = points[q]
+            if c == EMPTY:
+                return True
+            if c == BORDER:
+                continue
+            liberties = self.liberties[self.find(q)]
+            if c == color:
+                if liberties & ~bit:
+                    return True
+            elif liberties == bit:
+                return True
+        return False
+
+    # assert is a legal move calling (is_legal) first
+    def play(self, p, color):
+        self.turn = get_opponent(color)
+        self.ko = None
+        if p == PASS:
+            return 0
+        opponent = self.turn
+        points = self.points
+        liberties = self.liberties
+
+        bit = 1 << p
+        points[p] = color
+        self.hash ^= self.zobrist_keys[color][p]
+        self.swap_empty(self.empty_index[p], len(self.empty) - 1)
+        self.empty.pop()
+        root = p
+        liberties[p] = 0
+        for d in self.offsets:
+            q = p + d
+            c = points[q]
+            if c == EMPTY:
+                liberties[root] |= 1 << q
+            elif c == color:
+                neighbor_root = self.find(q)
+                if neighbor_root != root:
+                    root = self.union(root, neighbor_root)
+            elif c == opponent:
+                liberties[self.find(q)] &= ~bit
+        liberties[root] &= ~bit
+
+        captured = 0
+        for d in self.offsets:
+            q = p + d
+            if points[q] == opponent:
+                neighbor_root = self.find(q)
+                if not liberties[neighbor_root]:
+                    captured += self.remove_group(neighbor_root, color)
+                    last_captured = q
+        if captured == 1:
+            self.set_ko(p, last_captured)
+        self.captures[color] += captured
+        return captured
+
+    def union(self, a, b):
+        if self.group_size[a] < self.group_size[b]:
+            a, b = b, a
+        self.parent[b] = a
+        self.group_size[a] += self.group_size[b]
+        self.liberties[a] |= self.liberties[b]
+        next_stone = self.next_stone
+        next_stone[a], next_stone[b] = next_stone[b], next_stone[a]
+        return a
+
+    def remove_group(self, root, color):
+        points = self.points
+        keys = self.zobrist_keys[get_opponent(color)]
+        stones = [root]
+        q = self.next_stone[root]
+        while q != root:
+            stones.append(q)
+            q = self.next_stone[q]
+        for stone in stones:
+            points[stone] = EMPTY
+            self.hash ^= keys[stone]
+            self.empty_index[stone] = len(self.empty)
+            self.empty.append(stone)
+            self.parent[stone] = stone
+            self.group_size[stone] = 1
+            self.next_stone[stone] = stone
+        for stone in stones:
+            bit = 1 << stone
+            for d in self.offsets:
+                q = stone + d
+                if points[q] == color:
+                    self.liberties[self.find(q)] |= bit
+        return len(stones)
+
+
+# DIRECTORY :: BOTS
+
+
+class Heuristic:
+    # a leaf of a search board costs a lookup of the tracked features, any
+    # other board is counted once, with numpy over the whole array if it is
+    # there, and keeps not tracking them
+    def calculate_heuristic(board,
+                            stone_type,
+                            heuristic_type=HeuristicType.H1):
+        if board.eyes is not None:
+            eyes, liberty_points = board.eyes, board.liberty_points
+        elif np is not None:
+            eyes, liberty_points = Heuristic.get_features(
+                np.frombuffer(board.points, dtype=np.int8), board.stride)
+            eyes, liberty_points = eyes[0].tolist(), liberty_points[0].tolist()
+        else:
+            eyes, liberty_points = board.get_features()
+        if heuristic_type == HeuristicType.H1:
+            return eyes[stone_type]
+        if heuristic_type == HeuristicType.H2:
+            return liberty_points[stone_type]
+
+        return -1
+
+    # (eyes, liberty points) indexed by [board][color] for a (K, points)
+    # array of boards laid out like Board.points, from neighbor shifts
+    def get_features(boards, stride):
+        boards = np.atleast_2d(boards)
+        length = boards.shape[1]
+        center = boards[:, stride:length - stride]
+        around = [
+            boards[:, stride + d:length - stride + d]
+            for d in (-stride, 1, stride, -1)
+        ]
+        empty = center == EMPTY
+        eyes = np.zeros((len(boards), 3), dtype=np.int64)
+        liberty_points = np.zeros((len(boards), 3), dtype=np.int64)
+        for color in (BLACK, WHITE):
+            eye = empty
+            touches = False
+            for values in around:
+                eye = eye & (values == color)
+                touches = touches | (values == color)
+            eyes[:, color] = eye.sum(axis=1)
+            liberty_points[:, color] = (empty & touches).sum(axis=1)
+        return eyes, liberty_points
+
+    # a point the color should never fill: only its own stones or the edge around
+    def is_eye(board, p, color):
+        for d in board.offsets:
+            if board.points[p + d] != color and board.points[p + d] != BORDER:
+                return False
+        return True
+
+    # from the point of view of `stone_type`
+    def evaluate(board, stone_type, heuristic_type=HeuristicType.H1):
+        return Heuristic.calculate_heuristic(
+            board, stone_type,
+            heuristic_type) - Heuristic.calculate_heuristic(
+                board, get_opponent(stone_type), heuristic_type)
+
+
+# the search runs in the constructor of every bot and leaves its answer as
+# `best_move`, a point of `board` or None
+class Bot:
+    # best move for the side to move, None when there is no legal move
+    def get_move(self):
+        if self.best_move is None:
+            return None
+        return self.board.coords(self.best_move)
+
+    def move(self, game):
+        if not game.running:
+            return
+        move = self.get_move()
+        if move is None:
+            game.should_end = True
+            return
+        game.make_move(*move)
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+# fixed size table of searched positions, keyed by Board.get_key()
+# every bucket has a depth-preferred slot and an always-replace slot
+class TranspositionTable:
+    ENTRY_BYTES = 8 + 1 + 1 + 8 + 4  # key, depth, bound, score, move
+
+    def __init__(self, size_mb=16):
+        self.nr_buckets = int(size_mb * 2**20) // (2 * self.ENTRY_BYTES)
+        length = 2 * self.nr_buckets
+        self.keys = array('Q', [0]) * length
+        self.depths = array('b', [-1]) * length  # -1 marks an empty slot
+        self.bounds = array('b', [0]) * length
+        self.scores = array('d', [0]) * length
+        self.moves = array('i', [PASS]) * length
+        self.hits = 0
+        self.misses = 0
+        self.overwrites = 0
+
+    # (depth, bound, score, move) or None
+    def probe(self, key):
+        if self.nr_buckets:
+            slot = (key % self.nr_buckets) * 2
+            for slot in (slot, slot + 1):
+                if self.keys[slot] == key and self.depths[slot] >= 0:
+                    self.hits += 1
+                    return (self.depths[slot], BoundType(self.bounds[slot]),
+                            self.scores[slot], self.moves[slot])
+        self.misses += 1
+        return None
+
+    def store(self, key, depth, bound: BoundType, score, move):
+        if not self.nr_buckets:
+            return
+        slot = (key % self.nr_buckets) * 2
+        if self.keys[slot] != key and depth < self.depths[slot]:
+            slot += 1
+        if self.depths[slot] >= 0 and self.keys[slot] != key:
+            self.overwrites += 1
+        self.keys[slot] = key
+        self.depths[slot] = depth
+        self.bounds[slot] = bound.value
+        self.scores[slot] = score
+        self.moves[slot] = PASS if move is None else move
+
+    def get_stats(self):
+        return {
+            'tt_hits': self.hits,
+            'tt_misses': self.misses,
+            'tt_overwrites': self.overwrites,
+        }
+
+
+# depth first over the board with play / undo, only the current path and
+# the best line below every node of it are kept. deepens one ply at a time
+# until the deadline and answers with the deepest fully searched iteration
+class MinMaxBot(Bot):
+    def __init__(self,
+                 board,
+                 level=NodeLevel.MAX,
+                 difficulty=Difficulty.EASY,
+                 heuristic_type=HeuristicType.H1,
+                 transposition_table=None,
+                 time_limit=None,
+                 max_depth=None):
+        if difficulty == Difficulty.EASY:
+            self.max_depth, self.time_limit = 3, 0.5
+        if difficulty == Difficulty.MEDIUM:
+            self.max_depth, self.time_limit = 4, 1.5
+        if difficulty == Difficulty.HARD:
+            self.max_depth, self.time_limit = 5, 3
+        if time_limit is not None:
+            self.time_limit = time_limit
+        if max_depth is not None:
+            self.max_depth = max_depth
+
+        self.board = board.get_search_board()
+        self.stone_type = board.turn
+        self.heuristic_type = heuristic_type
+        self.transposition_table = transposition_table or TranspositionTable()
+        self.nodes = 0
+        self.evaluations = 0
+        self.depth_reached = 0
+        self.h = None
+        self.best_line = []
+        self.best_move = None
+
+        start = time.perf_counter()
+        self.deadline = start + self.time_limit
+        self.search(level)
+        self.elapsed = time.perf_counter() - start
+
+    def search(self, level):
+        stack_size = len(self.board.undo_stack)
+        for depth in range(1, self.max_depth + 1):
+            self.depth = depth
+            self.lines = [[] for _ in range(depth + 2)]  # best line by ply
+            try:
+                self.h = self.dfs(level)
+            except SearchTimeout:
+                while len(self.board.undo_stack) > stack_size:
+                    self.board.undo()
+                break
+            self.best_line = self.lines[0]
+            self.depth_reached = depth
+
+        self.best_move = self.best_line[0] if self.best_line else None
+        if self.depth_reached == 0:  # not even depth 1 finished
+            legal_moves = self.board.legal_moves()
+            self.best_move = legal_moves[0] if legal_moves else None
+
+    def evaluate(self):
+        self.evaluations += 1
+        return Heuristic.evaluate(self.board, self.stone_type,
+                                  self.heuristic_type)
+
+    def get_stats(self):
+        return {
+            'nodes': self.nodes,
+            'evaluations': self.evaluations,
+            'depth': self.depth_reached,
+            'time': self.elapsed,
+            **self.transposition_table.get_stats(),
+        }
+
+    def dfs(self, level: NodeLevel, ply=0):
+        self.nodes += 1
+        if self.nodes & 255 == 0 and time.perf_counter() > self.deadline:
+            raise SearchTimeout()
+
+        board = self.board
+        # values are stored from the side to move point of view
+        sign = 1 if level == NodeLevel.MAX else -1
+        depth = self.depth - ply
+        key = board.get_key()
+        self.lines[ply] = []
+        if ply > 0:
+            entry = self.transposition_table.probe(key)
+            # only exact scores, a bound from another search is no answer
+            if entry is not None and entry[0] >= depth and entry[
+                    1] == BoundType.EXACT:
+                return sign * entry[2]
+
+        legal_moves = board.legal_moves() if depth > 0 else []
+        if not legal_moves:
+            h = self.evaluate()
+            self.transposition_table.store(key, depth, BoundType.EXACT,
+                                           sign * h, None)
+            return h
+
+        child_level = NodeLevel.MAX if level == NodeLevel.MIN else NodeLevel.MIN
+        best_h = None
+        for p in legal_moves:
+            board.play(p)
+            h = self.dfs(child_level, ply + 1)
+            board.undo()
+
+            if best_h == None or (level == NodeLevel.MAX and best_h < h) or (
+                    level == NodeLevel.MIN and best_h > h):
+                best_h = h
+                self.lines[ply] = [p] + self.lines[ply + 1]
+
+        self.transposition_table.store(key, depth, BoundType.EXACT,
+                                       sign * best_h, self.lines[ply][0])
+        return best_h
+
+
+# negamax with alpha-beta pruning and iterative deepening, stops at the
+# deadline and answers with the deepest fully searched iteration
+class AlphaBetaBot(Bot):
+    def __init__(self,
+                 board,
+                 difficulty=Difficulty.EASY,
+                 heuristic_type=HeuristicType.H1,
+                 time_limit=None,
+                 max_depth=None,
+                 transposition_table=None):
+        if difficulty == Difficulty.EASY:
+            self.max_depth, self.time_limit = 2, 0.5
+        if difficulty == Difficulty.MEDIUM:
+            self.max_depth, self.time_limit = 4, 1.5
+        if difficulty == Difficulty.HARD:
+            self.max_depth, self.time_limit = 8, 3
+        if time_limit is not None:
+            self.time_limit = time_limit
+        if max_depth is not None:
+            self.max_depth = max_depth
+
+        self.board = board.get_search_board()
+        self.heuristic_type = heuristic_type
+        self.transposition_table = transposition_table or TranspositionTable()
+        self.nodes = 0
+        self.evaluations = 0
+        self.depth_reached = 0
+        self.best_move = None
+        self.root_move = None  # set by every finished root search with moves
+        self.h = None
+
+        start = time.perf_counter()
+        self.deadline = start + self.time_limit
+        self.search()
+        self.elapsed = time.perf_counter() - start
+
+    def search(self):
+        stack_size = len(self.board.undo_stack)
+        for depth in range(1, self.max_depth + 1):
+            try:
+                self.h = self.negamax(depth, -float('inf'), float('inf'))
+            except SearchTimeout:
+                while len(self.board.undo_stack) > stack_size:
+                    self.board.undo()
+                break
+            self.best_move = self.root_move
+            self.depth_reached = depth
+
+        if self.best_move is None:  # not even depth 1 finished
+            legal_moves = self.board.legal_moves()
+            self.best_move = legal_moves[0] if legal_moves else None
+
+    def negamax(self, depth, alpha, beta, ply=0):
+        self.nodes += 1
+        if self.nodes & 255 == 0 and time.perf_counter() > self.deadline:
+            raise SearchTimeout()
+
+        board = self.board
+        key = board.get_key()
+        pv_move = None
+        entry = self.transposition_table.probe(key)
+        if entry is not None:
+            entry_depth, bound, h, pv_move = entry
+            if entry_depth >= depth and ply > 0:
+                if bound == BoundType.EXACT:
+                    return h
+                if bound == BoundType.LOWER:
+                    alpha = max(alpha, h)
+                else:
+                    beta = min(beta, h)
+                if alpha >= beta:
+                    return h
+
+        legal_moves = board.legal_moves() if depth > 0 else []
+        if not legal_moves:
+            self.evaluations += 1
+            h = Heuristic.evaluate(board, board.turn, self.heuristic_type)
+            self.transposition_table.store(key, depth, BoundType.EXACT, h,
+                                           None)
+            return h
+
+        if pv_move in legal_moves:
+            legal_moves.remove(pv_move)
+            legal_moves.insert(0, pv_move)
+
+        alpha_start = alpha
+        best_h = -float('inf')
+        best_move = None
+        for p in legal_moves:
+            board.play(p)
+            h = -self.negamax(depth - 1, -beta, -alpha, ply + 1)
+            board.undo()
+            if h > best_h:
+                best_h = h
+                best_move = p
+                alpha = max(alpha, h)
+                if alpha >= beta:
+                    break
+
+        if best_h <= alpha_start:
+            bound = BoundType.UPPER
+        elif best_h >= beta:
+            bound = BoundType.LOWER
+        else:
+            bound = BoundType.EXACT
+        self.transposition_table.store(key, depth, bound, best_h, best_move)
+        if ply == 0:
+            self.root_move = best_move
+        return best_h
+
+    def get_stats(self):
+        return {
+            'nodes': self.nodes,
+            'evaluations': self.evaluations,
+            'depth': self.depth_reached,
+            'time': self.elapsed,
+            **self.transposition_table.get_stats(),
+        }
+
+
+# K random playouts of the same position played in lockstep on a (K, points)
+# numpy array, same board layout and playout rules as MCTSBot
+class BatchPlayouts:
+    def __init__(self, board, count, seed=None):
+        if np is None:
+            raise ImportError("BatchPlayouts needs numpy")
+        self.rng = np.random.default_rng(seed)
+        self.stride = board.stride
+        self.offsets = board.offsets
+        self.around = np.array(board.offsets)
+        self.earlier = np.tri(4, k=-1, dtype=bool)  # [d, e] for e before d
+        self.length = len(board.points)
+        self.all_points = np.array(board.all_points)
+        self.max_moves = 3 * len(board.all_points)
+        self.indexes = np.arange(self.length, dtype=np.int32)
+        # the rows holding points, border columns included, and their
+        # neighbors in each direction are plain slices of the boards
+        self.span = slice(self.stride, self.length - self.stride)
+        self.neighbors = [
+            slice(self.stride + d, self.length - self.stride + d)
+            for d in self.offsets
+        ]
+
+        self.ids = np.arange(count)  # playout held in each row
+        self.boards = np.tile(np.frombuffer(board.points, dtype=np.int8),
+                              (count, 1))
+        self.labels = self.get_labels()
+        self.liberties = self.get_liberties()
+        self.atari = BatchPlayouts.in_atari(self.liberties)  # by label
+        self.empty, self.empty_count, self.empty_slot = self.get_empty()
+        self.keys = np.array(board.zobrist_keys, dtype=np.uint64)
+        self.hashes = np.full(count, board.hash, dtype=np.uint64)
+        # the last positions since the move that captured nothing before them
+        self.positions = np.zeros((count, 16), dtype=np.uint64)
+        self.capture_run = np.zeros(count, dtype=np.int64)
+        self.turns = np.full(count, board.turn, dtype=np.int8)
+        self.captures = np.tile(np.array(board.captures), (count, 1))
+        self.ko = np.full(count, -1)  # simple ko point, playouts keep no history
+        self.passes = np.zeros(count, dtype=np.int8)
+        self.moves = 0
+
+    # group label of every point: the smallest point index of its group,
+    # computed once here and then kept up to date by step
+    def get_labels(self):
+        boards, span = self.boards, self.span
+        labels = np.tile(self.indexes, (len(boards), 1))
+        center = boards[:, span]
+        stones = (center == BLACK) | (center == WHITE)
+        same_color = [(boards[:, n] == center) & stones for n in self.neighbors]
+        while True:
+            new_labels = labels.copy()
+            for same, n in zip(same_color, self.neighbors):
+                new_labels[:, span] = np.minimum(
+                    new_labels[:, span],
+                    np.where(same, labels[:, n], self.length))
+            new_labels = np.take_along_axis(new_labels, new_labels, axis=1)
+            if np.array_equal(new_labels, labels):
+                return labels
+            labels = new_labels
+
+    # pseudo liberties of the group of every label: count, sum and sum of
+    # squares of the empty points next to each of its stones, the three side
+    # by side, computed once here and then kept up to date by step, only the
+    # labels in use are kept
+    def get_liberties(self):
+        liberties = np.zeros((len(self.boards), self.length, 3), dtype=np.int64)
+        groups = self.labels + self.get_base()
+        empty = self.boards[:, self.span] == EMPTY
+        for n in self.neighbors:
+            values = self.boards[:, n]
+            pairs = empty & ((values == BLACK) | (values == WHITE))
+            self.add_liberties(liberties, groups[:, n][pairs],
+                               np.nonzero(pairs)[1] + self.stride)
+        return liberties
+
+    # whether groups with these liberty stats have one liberty, all their
+    # pseudo liberties are the same point then
+    def in_atari(liberties):
+        count, total, squares = np.moveaxis(liberties, -1, 0)
+        return count * squares == total * total
+
+    # the empty points of every row first in `empty`, `empty_count` of them,
+    # and the slot of every empty point in it, kept up to date by step
+    def get_empty(self):
+        is_empty = self.boards[:, self.all_points] == EMPTY
+        empty = self.all_points[np.argsort(~is_empty, axis=1, kind='stable')]
+        empty_slot = np.zeros(self.boards.shape, dtype=np.int64)
+        np.put_along_axis(empty_slot, empty, np.arange(empty.shape[1])[None],
+                          axis=1)
+        return empty, is_empty.sum(axis=1), empty_slot
+
+    # adds `sign` times the liberty points to the groups at flat indexes,
+    # summed per group first so a group listed twice gets both
+    def add_liberties(self, liberties, groups, points, sign=1):
+        if not len(groups):
+            return
+        groups, inverse = np.unique(groups, return_inverse=True)
+        points = points.astype(np.float64)
+        liberties = liberties.reshape(-1, 3)
+        for k, weights in enumerate((None, points, points * points)):
+            liberties[groups, k] += sign * np.bincount(
+                inverse, weights, len(groups)).astype(np.int64)
+
+    # offset of every row in the flattened boards
+    def get_base(self):
+        return (np.arange(len(self.ids), dtype=np.int64) * self.length)[:, None]
+
+    # swaps two slots of the empty points of the rows
+    def swap_empty(self, rows, a, b):
+        p, q = self.empty[rows, a], self.empty[rows, b]
+        self.empty[rows, a], self.empty[rows, b] = q, p
+        self.empty_slot[rows, p], self.empty_slot[rows, q] = b, a
+
+    # values and groups around flat points of the boards, and whether each of
+    # those groups is in atari
+    def get_around(self, rows, points):
+        base = rows[:, None] * self.length
+        around = base + points[:, None] + self.around
+        values = self.boards.take(around)
+        groups = self.labels.take(around) + base
+        return values, groups, self.atari.take(groups)
+
+    # whether the empty points of the rows are moves a playout takes: legal,
+    # not the ko point and not an eye of the side to move
+    def is_playable(self, rows, points):
+        values, _, atari = self.get_around(rows, points)
+        turns = self.turns[rows, None]
+        friends = values == turns
+        eye = (friends | (values == BORDER)).all(axis=1)
+        playable = ((values == EMPTY) | (friends & ~atari) |
+                    ((values == BLACK + WHITE - turns) & atari)).any(axis=1)
+        return ~eye & playable & (points != self.ko[rows])
+
+    # a uniform pick among the playable points of every row, -1 to pass.
+    # like MCTSBot.get_random_move, random empty points are tried and the ones
+    # that aren't playable are swapped behind the untried ones, the few rows
+    # still undecided after `tries` rounds have their whole board looked at
+    def choose_moves(self, tries=4):
+        choice = np.full(len(self.ids), -1)
+        rows = np.nonzero(self.passes < 2)[0]
+        untried = self.empty_count[rows]
+        for _ in range(tries):
+            rows, untried = rows[untried > 0], untried[untried > 0]
+            if not len(rows):
+                return choice
+            k = (self.rng.random(len(rows)) * untried).astype(np.int64)
+            points = self.empty[rows, k]
+            playable = self.is_playable(rows, points)
+            choice[rows[playable]] = points[playable]
+            rows, untried, k = rows[~playable], untried[~playable] - 1, k[
+                ~playable]
+            self.swap_empty(rows, k, untried)
+        rows = rows[untried > 0]
+        if len(rows):
+            choice[rows] = self.scan_moves(rows)
+        return choice
+
+    # the playable points of whole boards, a uniform pick among them
+    def scan_moves(self, rows):
+        boards = self.boards[rows]
+        in_atari = np.take_along_axis(self.atari[rows],
+                                      self.labels[rows],
+                                      axis=1)
+        turns = self.turns[rows, None]
+        eye = True
+        playable = False
+        for n in self.neighbors:
+            values, atari = boards[:, n], in_atari[:, n]
+            friends = values == turns
+            eye = eye & (friends | (values == BORDER))
+            playable = playable | (values == EMPTY) | (friends & ~atari) | (
+                (values == BLACK + WHITE - turns) & atari)
+        legal = (boards[:, self.span] == EMPTY) & ~eye & playable
+        ko = self.ko[rows]
+        has_ko = np.nonzero(ko >= 0)[0]
+        legal[has_ko, ko[has_ko] - self.stride] = False
+        choice = (self.rng.random(legal.shape, dtype=np.float32) *
+                  legal).argmax(axis=1)
+        return np.where(legal[np.arange(len(rows)), choice],
+                        choice + self.stride, -1)
+
+    def step(self):
+        choice = self.choose_moves()
+        has_move = choice >= 0
+        active = self.passes < 2
+        self.passes = np.where(has_move, 0, self.passes + active)
+        self.ko = np.full(len(self.ids), -1)
+        self.moves += 1
+        rows = np.nonzero(has_move)[0]
+        if len(rows):
+            self.play(rows, choice[rows])
+        self.turns = np.where(active, BLACK + WHITE - self.turns, self.turns)
+
+    # plays the points on their rows, only the four points around each move,
+    # the groups it touches and the stones it captures are worked on
+    def play(self, rows, points):
+        labels = self.labels.reshape(-1)
+        liberties = self.liberties.reshape(-1, 3)
+        base = rows * self.length
+        at = base + points
+        values, groups, atari = self.get_around(rows, points)
+        turns = self.turns[rows]
+        friends = values == turns[:, None]
+        capture = (values == BLACK + WHITE - turns[:, None]) & atari
+        self.boards.reshape(-1)[at] = turns
+        self.hashes[rows] ^= self.keys[turns, points]
+        self.empty_count[rows] -= 1
+        self.swap_empty(rows, self.empty_slot[rows, points],
+                        self.empty_count[rows])
+
+        # the liberties of the groups around, less the point of the move as
+        # many times as they touch it, the opponent ones keep them
+        stones = (values == BLACK) | (values == WHITE)
+        same = groups[:, :, None] == groups[:, None]
+        first = stones & ~(same & self.earlier).any(axis=2)
+        times = same.sum(axis=2) * first
+        move_liberty = np.stack((np.ones_like(points), points, points * points),
+                                axis=1)
+        group_liberties = liberties.take(
+            groups, axis=0) - times[:, :, None] * move_liberty[:, None]
+        opponents = first & ~friends
+        liberties[groups[opponents]] = group_liberties[opponents]
+        self.atari.reshape(-1)[groups[opponents]] = BatchPlayouts.in_atari(
+            group_liberties[opponents])
+
+        # the move joins its friendly neighbor groups under the smallest
+        # label, the new group has their liberties and the ones of the move
+        new_groups = np.where(friends, groups, at[:, None]).min(axis=1)
+        around = np.where(values == EMPTY, points[:, None] + self.around, 0)
+        group_liberties = np.where((friends & first)[:, :, None],
+                                   group_liberties, 0).sum(axis=1) + np.stack(
+                                       ((around > 0).sum(axis=1),
+                                        around.sum(axis=1),
+                                        (around * around).sum(axis=1)),
+                                       axis=1)
+        liberties[new_groups] = group_liberties
+        self.atari.reshape(-1)[new_groups] = BatchPlayouts.in_atari(
+            group_liberties)
+        new_labels = new_groups - base
+        labels[at] = new_labels
+        joined = friends & (groups != new_groups[:, None])
+        for d in range(4):
+            hit = np.nonzero(joined[:, d])[0]
+            if len(hit):
+                hit_labels = self.labels[rows[hit]]
+                self.labels[rows[hit]] = np.where(
+                    hit_labels == (groups[hit, d] - base[hit])[:, None],
+                    new_labels[hit, None], hit_labels)
+
+        # opponent groups that were in atari next to the move lose their
+        # stones, which go back to the empty points and become liberties of
+        # the groups of the move color around them
+        hit = np.nonzero(capture.any(axis=1))[0]
+        capture_run = self.capture_run[rows[hit]]
+        self.capture_run[rows] = 0
+        if len(hit):
+            hit_rows = rows[hit]
+            hit_labels = self.labels[hit_rows]
+            removed = False
+            for d in range(4):
+                removed = removed | (
+                    (hit_labels == (groups[hit, d] - base[hit])[:, None]) &
+                    capture[hit, d, None])
+            removed_rows, removed_points = np.nonzero(removed)
+            removed_counts = np.bincount(removed_rows, minlength=len(hit))
+            starts = np.cumsum(removed_counts) - removed_counts
+            removed_rows = hit_rows[removed_rows]
+            removed_at = removed_rows * self.length + removed_points
+            self.boards.reshape(-1)[removed_at] = EMPTY
+            labels[removed_at] = removed_points
+            self.captures[hit_rows, turns[hit]] += removed_counts
+            self.hashes[hit_rows] ^= np.bitwise_xor.reduceat(
+                self.keys[BLACK + WHITE - self.turns[removed_rows],
+                          removed_points], starts)
+
+            slots = self.empty_count[removed_rows] + np.arange(
+                len(removed_rows)) - np.repeat(starts, removed_counts)
+            self.empty[removed_rows, slots] = removed_points
+            self.empty_slot[removed_rows, removed_points] = slots
+            self.empty_count[hit_rows] += removed_counts
+
+            around = removed_at[:, None] + self.around
+            pairs = self.boards.reshape(-1)[around] == self.turns[
+                removed_rows, None]
+            touched = (labels[around] + (removed_at - removed_points)[:, None]
+                       )[pairs]
+            self.add_liberties(
+                liberties, touched,
+                np.broadcast_to(removed_points[:, None], pairs.shape)[pairs])
+            self.atari.reshape(-1)[touched] = BatchPlayouts.in_atari(
+                liberties.take(touched, axis=0))
+
+            # simple ko: a lone stone took a single stone and has one liberty
+            liberty_counts = (values[hit] == EMPTY).sum(axis=1) + capture[
+                hit].sum(axis=1)
+            is_ko = (removed_counts == 1) & ~friends[hit].any(axis=1) & (
+                liberty_counts == 1)
+            self.ko[hit_rows[is_ko]] = points[hit[is_ko]] + self.around[
+                capture[hit[is_ko]].argmax(axis=1)]
+
+            # a run of captures that comes back to one of its positions
+            # ends the playout, like in MCTSBot.simulate
+            positions = self.positions[hit_rows]
+            repeated = ((positions == self.hashes[hit_rows, None]) &
+                        (np.arange(positions.shape[1]) < capture_run[:, None])
+                        ).any(axis=1)
+            self.passes[hit_rows[repeated]] = 2
+            self.positions[hit_rows, capture_run %
+                           positions.shape[1]] = self.hashes[hit_rows]
+            self.capture_run[hit_rows] = capture_run + 1
+
+    def keep(self, rows):
+        self.ids = self.ids[rows]
+        self.boards = self.boards[rows]
+        self.labels = self.labels[rows]
+        self.liberties = self.liberties[rows]
+        self.atari = self.atari[rows]
+        self.empty = self.empty[rows]
+        self.empty_count = self.empty_count[rows]
+        self.empty_slot = self.empty_slot[rows]
+        self.hashes = self.hashes[rows]
+        self.positions = self.positions[rows]
+        self.capture_run = self.capture_run[rows]
+        self.turns = self.turns[rows]
+        self.captures = self.captures[rows]
+        self.ko = self.ko[rows]
+        self.passes = self.passes[rows]
+
+    # winner of every playout, EMPTY for a draw; finished playouts are
+    # dropped from the arrays so the long ones don't keep the batch busy
+    def run(self):
+        winners = np.empty(len(self.ids), dtype=np.int8)
+        while len(self.ids) and self.moves < self.max_moves:
+            self.step()
+            done = self.passes >= 2
+            if 8 * done.sum() >= len(done):
+                winners[self.ids[done]] = self.get_winners()[done]
+                self.keep(~done)
+        winners[self.ids] = self.get_winners()
+        return winners
+
+    # stones, surrounded points and captures, like MCTSBot.get_winner
+    def get_winners(self):
+        center = self.boards[:, self.span]
+        values = [self.boards[:, n] for n in self.neighbors]
+        scores = self.captures.copy()
+        for color in (BLACK, WHITE):
+            eye = True
+            for v in values:
+                eye = eye & ((v == color) | (v == BORDER))
+            scores[:, color] += ((center == color) |
+                                 ((center == EMPTY) & eye)).sum(axis=1)
+        winners = np.where(scores[:, BLACK] > scores[:, WHITE], BLACK, WHITE)
+        return np.where(scores[:, BLACK] == scores[:, WHITE], EMPTY, winners)
+
+
+class MCTSNode:
+    def __init__(self, move, parent, color, untried_moves):
+        self.move = move
+        self.parent = parent
+        self.color = color  # color that played the move
+        self.children = []
+        self.untried_moves = untried_moves
+        self.wins = 0.0
+        self.visits = 0
+
+    def select_child(self, exploration):
+        log_visits = math.log(self.visits)
+        return max(self.children,
+                   key=lambda child: child.wins / child.visits + exploration *
+                   math.sqrt(log_visits / child.visits))
+
+
+# monte carlo tree search with UCT selection and random playouts that never
+# fill their own eyes, the tree moves are played and undone on the board and
+# every playout runs on a PlayoutBoard copy of the leaf
+class MCTSBot(Bot):
+    def __init__(self,
+                 board,
+                 difficulty=Difficulty.EASY,
+                 time_limit=None,
+                 playouts=None,
+                 exploration=1.0,
+                 seed=None):
+        if difficulty == Difficulty.EASY:
+            self.time_limit = 1
+        if difficulty == Difficulty.MEDIUM:
+            self.time_limit = 2
+        if difficulty == Difficulty.HARD:
+            self.time_limit = 4
+        if time_limit is not None:
+            self.time_limit = time_limit
+        self.max_playouts = playouts  # overrides the time limit
+        self.exploration = exploration
+
+        self.board = board
+        self.rng = random.Random(seed)
+        self.root = MCTSNode(None, None, get_opponent(board.turn),
+                             self.get_tree_moves())
+        self.nodes = 1
+        self.playouts = 0
+
+        start = time.perf_counter()
+        deadline = start + self.time_limit
+        while True:
+            if self.max_playouts is not None:
+                if self.playouts >= self.max_playouts:
+                    break
+            elif time.perf_counter() > deadline:
+                break
+            self.run_playout()
+            self.playouts += 1
+        self.elapsed = time.perf_counter() - start
+
+        self.best_move = None
+        if self.root.children:
+            self.best_move = max(self.root.children,
+                                 key=lambda child: child.visits).move
+
+    def get_tree_moves(self):
+        board = self.board
+        return [
+            p for p in board.legal_moves()
+            if not Heuristic.is_eye(board, p, board.turn)
+        ]
+
+    def run_playout(self):
+        board = self.board
+        node = self.root
+        played = 0
+        while not node.untried_moves and node.children:
+            node = node.select_child(self.exploration)
+            board.play(node.move)
+            played += 1
+
+        if node.untried_moves:
+            untried_moves = node.untried_moves
+            k = self.rng.randrange(len(untried_moves))
+            untried_moves[k], untried_moves[-1] = untried_moves[
+                -1], untried_moves[k]
+            p = untried_moves.pop()
+            color = board.turn
+            board.play(p)
+            played += 1
+            child = MCTSNode(p, node, color, self.get_tree_moves())
+            node.children.append(child)
+            node = child
+            self.nodes += 1
+
+        winner = self.get_winner(self.simulate())
+        for _ in range(played):
+            board.undo()
+
+        while node is not None:
+            node.visits += 1
+            if winner == node.color:
+                node.wins += 1
+            elif winner == EMPTY:
+                node.wins += 0.5
+            node = node.parent
+
+    # random moves on a PlayoutBoard until both sides pass, returns it, a run
+    # of captures that repeats a position (kos simple ko lets go round) ends it
+    def simulate(self):
+        board = PlayoutBoard(self.board)
+        played = 0
+        passes = 0
+        max_moves = 3 * len(board.all_points)
+        positions = set()  # since the last move that captured nothing
+        while passes < 2 and played < max_moves:
+            p = self.get_random_move(board, board.turn)
+            if board.play(p, board.turn):
+                if board.hash in positions:
+                    break
+                positions.add(board.hash)
+            elif p != PASS:
+                positions.clear()
+            played += 1
+            passes = passes + 1 if p == PASS else 0
+        return board
+
+    # random empty points without repeats, a point that was tried is swapped
+    # past the ones left to draw from
+    def get_random_move(self, board, color):
+        empty = board.empty
+        random = self.rng.random
+        count = len(empty)
+        while count:
+            k = int(random() * count)
+            p = empty[k]
+            if not Heuristic.is_eye(board, p, color) and board.is_legal(
+                    p, color):
+                return p
+            count -= 1
+            board.swap_empty(k, count)
+        return PASS
+
+    # stones, surrounded points and captures, like the end of game score
+    def get_winner(self, board):
+        points = board.points
+        scores = list(board.captures)
+        for p in board.all_points:
+            c = points[p]
+            if c == EMPTY:
+                for d in board.offsets:
+                    if points[p + d] != BORDER:
+                        c = points[p + d]
+                        break
+                if not Heuristic.is_eye(board, p, c):
+                    continue
+            scores[c] += 1
+
+        if scores[BLACK] == scores[WHITE]:
+            return EMPTY
+        return BLACK if scores[BLACK] > scores[WHITE] else WHITE
+
+    def get_stats(self):
+        return {
+            'nodes': self.nodes,
+            'playouts': self.playouts,
+            'playouts_per_second': self.playouts / self.elapsed,
+            'time': self.elapsed,
+        }
+
+# DIRECTORY :: WORKERS
+
+
+# kept by the worker process between moves, one per (algorithm, heuristic)
+# since their scores are not comparable
+worker_transposition_tables = {}
+
+
+def get_worker_transposition_table(algorithm: Algorithm,
+                                   heuristic_type=HeuristicType.H1):
+    key = (algorithm, heuristic_type)
+    if key not in worker_transposition_tables:
+        worker_transposition_tables[key] = TranspositionTable()
+    return worker_transposition_tables[key]
+
+
+# depth of a ParallelSearch by difficulty
+PARALLEL_DEPTHS = {
+    Difficulty.EASY: 3,
+    Difficulty.MEDIUM: 4,
+    Difficulty.HARD: 5,
+}
+parallel_executor = None  # pool of the ParallelSearch bots of this process
+parallel_workers = 0
+
+
+def get_parallel_executor(workers):
+    global parallel_executor, parallel_workers
+    if parallel_executor is None or parallel_workers != workers:
+        if parallel_executor is not None:
+            parallel_executor.shutdown()
+        parallel_executor = ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+        parallel_workers = workers
+    return parallel_executor
+
+
+# a pool worker joins its child processes on exit without running atexit, the
+# nested pool is shut down by a finalizer ahead of the queue ones (priority 10)
+# so its workers still get their stop signal
+def shutdown_parallel_executor():
+    global parallel_executor
+    if parallel_executor is not None:
+        parallel_executor.shutdown()
+        parallel_executor = None
+
+
+multiprocessing.util.Finalize(None,
+                              shutdown_parallel_executor,
+                              exitpriority=100)
+
+
+# shuts a pool down without waiting for its tasks, the processes are killed
+# with whatever they run
+def terminate_executor(executor):
+    processes = list((executor._processes or {}).values())
+    executor.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        process.terminate()
+
+
+# initializer of the processes that run bots: a bot process killed in the
+# middle of a search takes its nested pool along instead of leaving it behind
+def exit_on_terminate():
+    def terminate(signum, frame):
+        global parallel_executor
+        if parallel_executor is not None:
+            terminate_executor(parallel_executor)
+            parallel_executor = None
+        os._exit(1)
+
+    signal.signal(signal.SIGTERM, terminate)
+
+
+# searches `board` with the bot of `algorithm`, options go to its constructor,
+# `workers` splits a fixed depth search of the root moves across processes
+# (ParallelSearch, depth by difficulty unless a `depth` option is given)
+def create_bot(board,
+               algorithm: Algorithm,
+               difficulty: Difficulty,
+               heuristic_type=HeuristicType.H1,
+               transposition_table=None,
+               workers=None,
+               **options):
+    if workers is not None:
+        if algorithm == Algorithm.MCTS:
+            raise ValueError("workers only apply to min-max and alpha-beta")
+        depth = options.pop('depth', PARALLEL_DEPTHS[difficulty])
+        return ParallelSearch(board, get_parallel_executor(workers), workers,
+                              depth, heuristic_type, **options)
+    if algorithm == Algorithm.MIN_MAX:
+        return MinMaxBot(board, NodeLevel.MAX, difficulty, heuristic_type,
+                         transposition_table, **options)
+    if algorithm == Algorithm.MCTS:
+        return MCTSBot(board, difficulty, **options)
+    return AlphaBetaBot(board,
+                        difficulty,
+                        heuristic_type,
+                        transposition_table=transposition_table,
+                        **options)
+
+
+# runs in a worker process on a Board snapshot, returns ((i, j) or None, stats)
+def search_move(snapshot,
+                algorithm: Algorithm,
+                difficulty: Difficulty,
+                heuristic_type=HeuristicType.H1,
+                workers=None):
+    board = Board.from_snapshot(snapshot)
+    bot = create_bot(board, algorithm, difficulty, heuristic_type,
+                     get_worker_transposition_table(algorithm, heuristic_type),
+                     workers)
+    return bot.get_move(), bot.get_stats()
+
+
+# scores root moves of a snapshot to a fixed depth, runs in a worker process
+# returns ([(h, point)], nodes) with h from the side to move point of view
+def search_root_moves(snapshot, moves, depth, heuristic_type=HeuristicType.H1):
+    board = Board.from_snapshot(snapshot)
+    board.track_features()  # a board of its own, searched by every move
+    results = []
+    nodes = 0
+    for p in moves:
+        board.play(p)
+        if depth > 1:
+            bot = AlphaBetaBot(
+                board,
+                heuristic_type=heuristic_type,
+                time_limit=float('inf'),
+                max_depth=depth - 1,
+                transposition_table=get_worker_transposition_table(
+                    Algorithm.ALPHA_BETA, heuristic_type))
+            h = -bot.h
+            nodes += bot.nodes
+        else:
+            h = -Heuristic.evaluate(board, board.turn, heuristic_type)
+        nodes += 1
+        board.undo()
+        results.append((h, p))
+    return results, nodes
+
+
+# splits the root moves across `workers` processes of `executor` and keeps
+# the best of their scores, ties go to the lowest point for every worker count
+class ParallelSearch(Bot):
+    def __init__(self,
+                 board,
+                 executor,
+                 workers,
+                 depth,
+                 heuristic_type=HeuristicType.H1):
+        self.board = board
+        self.depth = depth
+        self.nodes = 0
+        self.h = None
+        self.best_move = None
+
+        start = time.perf_counter()
+        snapshot = board.get_snapshot()
+        legal_moves = board.legal_moves()
+        futures = [
+            executor.submit(search_root_moves, snapshot,
+                            legal_moves[k::workers], depth, heuristic_type)
+            for k in range(min(workers, len(legal_moves)))
+        ]
+        for future in futures:
+            results, nodes = future.result()
+            self.nodes += nodes
+            for h, p in results:
+                if self.best_move is None or (h, -p) > (self.h,
+                                                        -self.best_move):
+                    self.h, self.best_move = h, p
+        self.elapsed = time.perf_counter() - start
+
+    def get_stats(self):
+        return {
+            'nodes': self.nodes,
+            'depth': self.depth,
+            'time': self.elapsed,
+        }
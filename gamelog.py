@@ -0,0 +1,129 @@
+import json
+import os
+import time
+import uuid
+
+# DIRECTORY :: CONSTANTS
+BUFFER_SIZE = 1 << 16
+FLUSH_INTERVAL = 5.0  # s
+MAX_BYTES = 16 << 20  # a file is rotated once it grows past this
+BACKUPS = 5  # path.1 ... path.5 are kept
+
+# DIRECTORY :: LOG
+
+
+# JSON lines, one per move, appended to a buffered file, every record holds
+# the game id so a game can be followed across rotated files:
+#   {"game":"...","event":"start","size":8,"time":...,...}
+#   {"game":"...","move":1,"color":1,"point":[3,3]}  point is null for a pass
+#   {"game":"...","event":"end","result":"B+3",...}
+class GameLogger:
+    def __init__(self,
+                 path,
+                 flush_interval=FLUSH_INTERVAL,
+                 max_bytes=MAX_BYTES,
+                 backups=BACKUPS):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.game = None
+        self.move = 0
+        self.open()
+
+    def open(self):
+        self.file = open(self.path, 'a', buffering=BUFFER_SIZE)
+        self.bytes = os.path.getsize(self.path)
+        self.last_flush = time.monotonic()
+
+    # path -> path.1 -> path.2 ..., the oldest one is dropped
+    def rotate(self):
+        self.file.close()
+        for index in range(self.backups - 1, 0, -1):
+            if os.path.exists(f"{self.path}.{index}"):
+                os.replace(f"{self.path}.{index}",
+                           f"{self.path}.{index + 1}")
+        if self.backups > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        self.open()
+
+    def write(self, record):
+        if self.bytes >= self.max_bytes:
+            self.rotate()
+        line = json.dumps(record, separators=(',', ':')) + '\n'
+        self.file.write(line)
+        self.bytes += len(line)
+        self.maybe_flush()
+
+    # flushes once the interval went by, also called from the frame loop so
+    # moves don't wait in the buffer while nobody plays
+    def maybe_flush(self):
+        if time.monotonic() - self.last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        self.file.flush()
+        self.last_flush = time.monotonic()
+
+    def start_game(self, size, **info):
+        self.game = uuid.uuid4().hex[:12]
+        self.move = 0
+        self.write({
+            'game': self.game,
+            'event': 'start',
+            'size': size,
+            'time': time.time(),
+            **info,
+        })
+
+    # move is (i, j) or None for a pass
+    def add_move(self, color, move):
+        self.move += 1
+        self.write({
+            'game': self.game,
+            'move': self.move,
+            'color': color,
+            'point': move,
+        })
+
+    def end_game(self, result=None, **info):
+        self.write({
+            'game': self.game,
+            'event': 'end',
+            'result': result,
+            'moves': self.move,
+            'time': time.time(),
+            **info,
+        })
+        self.flush()
+
+    def close(self):
+        self.file.close()
+
+
+# (id, size, [(color, move)], end record) of every game that was logged from
+# its start, rotated files are read from the oldest
+def read_games(path, backups=BACKUPS):
+    paths = [f"{path}.{index}" for index in range(backups, 0, -1)] + [path]
+    games = {}
+    for log_path in paths:
+        if not os.path.exists(log_path):
+            continue
+        with open(log_path, 'r') as f:
+            for line in f:
+                record = json.loads(line)
+                event = record.get('event')
+                if event == 'start':
+                    games[record['game']] = (record['size'], [])
+                elif record['game'] not in games:
+                    continue
+                elif event == 'end':
+                    size, moves = games.pop(record['game'])
+                    yield record['game'], size, moves, record
+                else:
+                    point = record['point']
+                    games[record['game']][1].append(
+                        (record['color'],
+                         None if point is None else tuple(point)))
@@ -1,21 +1,33 @@
 from typing import Set, Text
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
 import arcade
 import arcade.gui
 import arcade.sprite
 from arcade.gui.manager import UIManager
 from enum import Enum
+import bisect
+import json
 import os
-import copy
 import random
 import time
+from engine import (Algorithm, Board, Difficulty, GameType, HeuristicType,
+                    Moves, StoneType, TableDimension, exit_on_terminate,
+                    search_move, terminate_executor)
+from gamelog import GameLogger
+from sgf import GameRecord, load_games, save_games
 
 # DIRECTORY :: CONSTANTS
 WINDOW_TITLE = 'Adam Adrian Claudiu - GO!'
 BACKGROUND_COLOR = arcade.color.DARK_SLATE_BLUE
 BLACK_STONE_PATH = 'assets/black.png'
 WHITE_STONE_PATH = 'assets/white.png'
-DIRECTIONS_X = (0, 1, 0, -1)
-DIRECTIONS_Y = (-1, 0, 1, 0)
+GRID_COLOR = arcade.color.WHITE
+GRID_LETTERS = 'ABCDEFGHJKLMNOPQRSTUVWXYZ'  # go columns skip the I
+PROFILE_OVERLAY = os.environ.get('GO_PROFILE') == '1'  # F3 toggles it
+PROFILE_TRACE_PATH = os.environ.get('GO_TRACE')  # JSON-lines trace file
+GAME_LOG_PATH = os.environ.get('GO_GAME_LOG')  # JSON lines, one per move
+BOT_WORKERS = int(os.environ.get('GO_BOT_WORKERS', 0)) or None  # processes
 
 
 # DIRECTORY :: UTIL
@@ -24,33 +36,102 @@ def get_path(rel_path):
     return os.path.join(script_dir, rel_path)
 
 
-class Debugger:
-    ord_move = 0
-    moves = []
-    problem_moves = []
+# text rendered once into a sprite, so it can be batched in a SpriteList and
+# drawn every frame without laying it out again
+def create_text_sprite(text,
+                       x,
+                       y,
+                       color,
+                       font_size=12,
+                       anchor_x='left',
+                       anchor_y='baseline'):
+    image = arcade.get_text_image(text=text,
+                                  text_color=color,
+                                  font_size=font_size)
+    sprite = arcade.Sprite()
+    sprite.texture = arcade.Texture(f"text-{text}-{color}-{font_size}",
+                                    image,
+                                    hit_box_algorithm='None')
+    sprite.center_x = x
+    sprite.center_y = y
+    if anchor_x == 'left':
+        sprite.left = x
+    if anchor_x == 'right':
+        sprite.right = x
+    if anchor_y in ('baseline', 'bottom'):
+        sprite.bottom = y
+    if anchor_y == 'top':
+        sprite.top = y
+    return sprite
+
+
+# a sprite list of texts, old texts are dropped from its texture atlas like
+# the arcade gui does, a timer would fill it otherwise
+def create_hud():
+    hud = arcade.SpriteList()
+    hud._keep_textures = False
+    return hud
+
+
+# one line of text in a hud, it is laid out again only when its value changes
+class HudText:
+    def __init__(self, hud, x, y, color, font_size, anchor_x='center'):
+        self.hud = hud
+        self.x = x
+        self.y = y
+        self.color = color
+        self.font_size = font_size
+        self.anchor_x = anchor_x
+        self.text = None
+        self.sprite = None
+
+    def set(self, text):
+        if text == self.text:
+            return
+        self.text = text
+        if self.sprite is not None:
+            self.sprite.remove_from_sprite_lists()
+        self.sprite = create_text_sprite(text, self.x, self.y, self.color,
+                                         self.font_size, self.anchor_x,
+                                         'center')
+        self.hud.append(self.sprite)
 
-    def add_move(i, j, type):
-        Debugger.ord_move += 1
-        Debugger.moves += [[Debugger.ord_move, (i, j), type.name]]
 
-    def get_moves_str():
-        text = ""
-        for move in Debugger.moves:
-            text += f"Move [{move[0]}] : " + str(move[1:]) + '\n'
-        return text
+bot_executor = None
 
-    def print_moves():
-        for move in Debugger.moves:
-            print(f"Move [{move[0]}] : ", move[1:])
 
-    def write_moves(path):
-        f = open(get_path(path), 'w')
-        f.write(Debugger.get_moves_str())
-        f.close()
+# bots search in another process so the frame loop never waits for them
+def get_bot_executor():
+    global bot_executor
+    if bot_executor is None:
+        bot_executor = ProcessPoolExecutor(
+            max_workers=1,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=exit_on_terminate)
+    return bot_executor
+
 
-    def reset_moves():
-        Debugger.ord_move = 0
-        Debugger.moves.clear()
+# kills the worker with any search in it, the next bot move starts a new one
+def stop_bot_executor():
+    global bot_executor
+    if bot_executor is not None:
+        terminate_executor(bot_executor)
+        bot_executor = None
+
+
+game_log = None
+
+
+# one log for every game of the session, None when GO_GAME_LOG isn't set
+def get_game_log():
+    global game_log
+    if game_log is None and GAME_LOG_PATH is not None:
+        game_log = GameLogger(get_path(GAME_LOG_PATH))
+    return game_log
+
+
+class Debugger:
+    problem_moves = []
 
     def get_matrix_str(matrix):
         text = ""
@@ -58,45 +139,128 @@ class Debugger:
             text += str([el for el in matrix[i]]) + '\n'
         return text
 
-    def get_move_pairs_str():
-        return f"[{','.join([str(x[1]) for x in Debugger.moves])}]"
-
-    def write_move_pairs(path):
-        f = open(get_path(path), 'w')
-        f.write(Debugger.get_move_pairs_str())
-        f.close()
+    def write_sgf(path, record):
+        save_games(get_path(path), [record])
 
-    def read_move_pairs(path):
-        f = open(get_path(path), 'r')
-        Debugger.problem_moves = eval(f.read())
+    # moves of the first game, None for a pass
+    def read_sgf(path):
+        record = next(load_games(get_path(path)))
+        Debugger.problem_moves = [move for _, move in record.moves]
 
     def write_matrix(path, matrix):
         f = open(get_path(path), 'w')
         f.write(Debugger.get_matrix_str(matrix))
         f.close()
 
-    def get_clusters_str(clusters):
-        text = ""
-        for cluster in clusters.values():
-            text += f"id= {cluster.id} ;liberties = {cluster.liberties} \n"
-        return text
-
-    def write_clusters(path, clusters):
-        f = open(get_path(path), 'w')
-        f.write(Debugger.get_clusters_str(clusters))
-        f.close()
-
-    def print_cluster_stone_matrix(stone_matrix):
-        for i in range(len(stone_matrix) - 1, -1, -1):
-            print([stone.cluster_id for stone in stone_matrix[i]])
-
     def print_matrix(matrix):
         for i in range(len(matrix) - 1, -1, -1):
             print([el for el in matrix[i]])
 
-    def print_clusters(clusters):
-        for cluster in clusters.values():
-            print(cluster.id, cluster.liberties)
+
+# frame and move timings, everything is a no-op until setup enables it, the
+# callers only pay for a call and a flag check
+class Profiler:
+    FRAME_BUCKETS = (1, 2, 4, 8, 16, 33, 66)  # ms, upper edges, last is open
+    TRACE_INTERVAL = 1.0  # s between the frame lines of the trace
+
+    enabled = False
+    overlay = False
+    trace = None
+    frames = {}  # name -> [count, total ms, max ms, histogram] since setup
+    interval = {}  # the same, since the last frame line of the trace
+    moves = {}  # name -> ms of the last move
+    bot = {}  # stats of the last bot move
+    last_trace = 0.0
+
+    def setup(overlay, trace_path):
+        Profiler.overlay = overlay
+        Profiler.enabled = overlay or trace_path is not None
+        if trace_path is not None:
+            Profiler.trace = open(get_path(trace_path), 'a')
+        Profiler.last_trace = time.perf_counter()
+
+    def start():
+        return time.perf_counter() if Profiler.enabled else None
+
+    def add_frame(frames, name, ms):
+        if name not in frames:
+            frames[name] = [0, 0.0, 0.0, [0] * (len(Profiler.FRAME_BUCKETS) + 1)]
+        entry = frames[name]
+        entry[0] += 1
+        entry[1] += ms
+        entry[2] = max(entry[2], ms)
+        entry[3][bisect.bisect_left(Profiler.FRAME_BUCKETS, ms)] += 1
+
+    def get_frames_dict(frames):
+        return {
+            name: {
+                'count': count,
+                'mean_ms': total / count,
+                'max_ms': max_ms,
+                'histogram': histogram,
+            }
+            for name, (count, total, max_ms, histogram) in frames.items()
+        }
+
+    def stop_frame(name, start):
+        if start is None:
+            return
+        now = time.perf_counter()
+        ms = (now - start) * 1000
+        Profiler.add_frame(Profiler.frames, name, ms)
+        Profiler.add_frame(Profiler.interval, name, ms)
+        if now - Profiler.last_trace >= Profiler.TRACE_INTERVAL:
+            Profiler.write({
+                'event': 'frames',
+                'buckets_ms': Profiler.FRAME_BUCKETS,
+                **Profiler.get_frames_dict(Profiler.interval),
+            })
+            Profiler.interval = {}
+            Profiler.last_trace = now
+
+    def stop_move(name, start, **values):
+        if start is None:
+            return
+        ms = (time.perf_counter() - start) * 1000
+        Profiler.moves[name] = ms
+        Profiler.write({'event': 'move', 'name': name, 'ms': ms, **values})
+
+    def add_bot(stats, start):
+        if start is None:
+            return
+        Profiler.bot = {
+            'wall_ms': (time.perf_counter() - start) * 1000,
+            **stats,
+        }
+        Profiler.write({'event': 'bot', **Profiler.bot})
+
+    def write(record):
+        if Profiler.trace is None:
+            return
+        record = {'timestamp': time.time(), **record}
+        Profiler.trace.write(json.dumps(record) + '\n')
+        Profiler.trace.flush()
+
+    def get_overlay_lines():
+        lines = []
+        for name, (count, total, max_ms, _) in Profiler.frames.items():
+            lines.append(
+                f"{name} {total / count:.2f} ms avg, {max_ms:.1f} ms max")
+        if Profiler.moves:
+            lines.append(', '.join(f"{name} {ms:.2f} ms"
+                                   for name, ms in Profiler.moves.items()))
+        if Profiler.bot:
+            lines.append(', '.join(
+                f"{name} {value:.3g}" if isinstance(value, float) else
+                f"{name} {value}" for name, value in Profiler.bot.items()))
+        return lines
+
+    def draw_overlay(x, y):
+        if not Profiler.overlay:
+            return
+        for line in Profiler.get_overlay_lines():
+            arcade.draw_text(line, x, y, arcade.color.YELLOW, font_size=10)
+            y -= 14
 
 
 class Timer:
@@ -117,59 +281,6 @@ class Timer:
         return repr
 
 
-# DIRECTORY :: ENUMS
-class Algorithm(Enum):
-    MIN_MAX = 0
-    ALPHA_BETA = 1
-
-
-class Border(Enum):
-    LEFT = 0
-    TOP = 1
-    RIGHT = 2
-    BOTTOM = 4
-
-
-class Difficulty(Enum):
-    EASY = 0
-    MEDIUM = 1
-    HARD = 2
-
-
-class TableDimension(Enum):
-    DIM7x7 = 0
-    DIM9x9 = 1
-    DIM10x10 = 2
-
-
-class Moves(Enum):
-    CNT50 = 0
-    CNT100 = 1
-    CNT200 = 2
-
-
-class GameType(Enum):
-    PVP = 0
-    PVA = 1
-    AVA = 2
-
-
-class StoneType(Enum):
-    EMPTY = 0
-    BLACK = 1
-    WHITE = 2
-
-
-class HeuristicType(Enum):
-    H1 = 0
-    H2 = 0
-
-
-class NodeLevel(Enum):
-    MIN = 0
-    MAX = 1
-
-
 # DIRECTORY :: COMPONENTS
 
 
@@ -217,9 +328,7 @@ class MyGhostFlatButton(arcade.gui.UIGhostFlatButton):
         if text == 'BACK' or text == 'GO BACK':
             window.show_view(MenuView())
         if text == 'PLAY' or text == 'PLAY AGAIN':
-            StoneCluster.uuid = 0
-            Debugger.reset_moves()
-            #Debugger.read_move_pairs('pairs.out')
+            #Debugger.read_sgf('game.sgf')
             window.show_view(GameView(self.selected_options))
 
 
@@ -241,12 +350,7 @@ class PlayerButton(arcade.gui.UIGhostFlatButton):
             self.player.resign()
 
         if text == "PASS":
-            self.game.table.illegal_stone = None
-            self.game.moves_played += 1
-            if self.game.moves_played == self.game.available_moves:
-                self.game.should_end = True
-            else:
-                self.game.next_turn()
+            self.game.make_pass()
 
 
 class MySelectableButton(arcade.gui.UIGhostFlatButton):
@@ -265,23 +369,6 @@ class MySelectableButton(arcade.gui.UIGhostFlatButton):
         self.view.set_option(category, self.option)
 
 
-class MyToggler(arcade.gui.UIToggle):
-    def __init__(self, center_x, center_y, height, value, view):
-        super().__init__(
-            center_x=center_x,
-            center_y=center_y,
-            height=height,
-            value=value,
-        )
-        self.view = view
-        Style.set_toggle(self)
-
-    def on_click(self):
-        super().on_click()
-        self.view.selected_options.algorithm = Algorithm(
-            int(self.view.buttons['algorithm'].value))
-
-
 # DIRECTORY :: STYLES
 
 
@@ -312,14 +399,6 @@ class Style:
             border_color_press=arcade.color.WHITE,
         )
 
-    def set_toggle(toggle: MyToggler):
-        toggle.set_style_attrs(
-            color_false=(220, 215, 222),
-            bg_color_false=(100, 100, 100),
-            color_true=(220, 215, 222),
-            bg_color_true=(11, 167, 219),
-        )
-
 
 class Textures:
     black_stone = arcade.load_texture(BLACK_STONE_PATH)
@@ -341,46 +420,18 @@ class Player:
         self.has_resigned = False
         self.stone_type = stone_type
 
-    def draw(self, name_y, score_y, time_y, name_color):
-        self.draw_name(name_y, name_color)
-        self.draw_time(time_y)
-        self.draw_score(score_y)
+    def create_texts(self, hud, name_y, score_y, time_y, name_color):
+        self.name_text = HudText(hud, self.column_x, name_y, name_color, 20)
+        self.score_text = HudText(hud, self.column_x, score_y,
+                                  arcade.color.WHITE, 18)
+        self.time_text = HudText(hud, self.column_x, time_y,
+                                 arcade.color.WHITE, 18)
 
-    def draw_name(self, start_y, color):
-        arcade.draw_text(
-            self.name,
-            start_x=self.column_x,
-            start_y=start_y,
-            color=color,
-            font_size=20,
-            anchor_x='center',
-            anchor_y='center',
-            align='center',
-        )
-
-    def draw_score(self, start_y):
-        arcade.draw_text(
-            f"SCORE: {self.score}",
-            start_x=self.column_x,
-            start_y=start_y,
-            color=arcade.color.WHITE,
-            font_size=18,
-            anchor_x='center',
-            anchor_y='center',
-            align='center',
-        )
-
-    def draw_time(self, start_y):
-        arcade.draw_text(
-            f"TIME: {self.time}",
-            start_x=self.column_x,
-            start_y=start_y,
-            color=arcade.color.WHITE,
-            font_size=18,
-            anchor_x='center',
-            anchor_y='center',
-            align='center',
-        )
+    # the texts are drawn with their hud
+    def update_texts(self):
+        self.name_text.set(self.name)
+        self.score_text.set(f"SCORE: {self.score}")
+        self.time_text.set(f"TIME: {self.time}")
 
     def resign(self):
         self.has_resigned = True
@@ -397,7 +448,6 @@ class StoneSprite(arcade.sprite.Sprite):
         scale = size / 900
         self.type = type
         self.table_position = table_position
-        self.cluster_id = None
 
         super().__init__(
             filename=get_path('assets/white.png'),
@@ -415,82 +465,29 @@ class StoneSprite(arcade.sprite.Sprite):
         self.alpha = 255
 
 
-class StoneCluster:
-    uuid = 0
-
-    def __init__(self, stone: StoneSprite, liberties: set):
-        self.id = StoneCluster.uuid
-        self.type = stone.type
-        self.stones = set([stone])
-        self.liberties = liberties
-        StoneCluster.uuid += 1
-
-    def merge(self, cluster):
-        for stone in cluster.stones:
-            stone.cluster_id = self.id
-        self.stones.update(cluster.stones)
-
-    def update_capture_score(self, game):
-        if game.turn == game.player1.stone_type:
-            game.player1.score += len(self.stones)
+class Table:
+    # dimension is a TableDimension or any number of rows, the grid is the
+    # largest one with even squares that fits in width x height, centered
+    def __init__(self, start_x, start_y, width, height, dimension):
+        if isinstance(dimension, TableDimension):
+            self.nr_rows = int(dimension.name[3:].split('x')[0])
         else:
-            game.player2.score += len(self.stones)
-
-    def clear_captured_stones(self):
-        for stone in self.stones:
-            stone.type = StoneType.EMPTY
-            stone.cluster_id = None
-
-    def update_liberties(self, table):
-        self.liberties = set()
-        for stone in self.stones:
-            xc, yc = stone.table_position
-            self.liberties.update(table.get_stone_liberties(xc, yc))
-
-    def update_liberties_local(self, table, cluster_matrix):
-        self.liberties.clear()
-        for stone in self.stones:
-            xc, yc = stone.table_position
-            for i in range(len(DIRECTIONS_X)):
-                x = xc + DIRECTIONS_X[i]
-                y = yc + DIRECTIONS_Y[i]
-                if table.is_valid_position(x,
-                                           y) and cluster_matrix[x][y] == None:
-                    self.liberties.add((x, y))
-
-
-class Territory:
-    def __init__(self):
-        self.visited = set()
-        self.colors = set()
-        self.borders = set()  # distinct borders (vertex aren't included)
-
-    def is_valid(self):
-        return not (len(self.colors) > 1 or len(self.borders) > 1)
-
+            self.nr_rows = dimension
 
-class Table:
-    def __init__(self, start_x, start_y, width, height,
-                 dimension: TableDimension):
-        self.start_x = start_x
-        self.start_y = start_y
-        self.width = width
-        self.height = height
-
-        if dimension == TableDimension.DIM7x7:
-            self.nr_rows = 7
-        if dimension == TableDimension.DIM9x9:
-            self.nr_rows = 9
-        if dimension == TableDimension.DIM10x10:
-            self.nr_rows = 10
-
-        self.square_size = self.height // self.nr_rows
+        self.square_size = min(width, height) // self.nr_rows // 2 * 2
         self.stone_size = self.square_size // 2
+        self.width = self.height = self.square_size * self.nr_rows
+        self.start_x = start_x + (width - self.width) // 2
+        self.start_y = start_y + (height - self.height) // 2
 
+        self.board = Board(self.nr_rows + 1)  # game state lives here
         self.stone_sprites = arcade.SpriteList()
         self.stone_matrix = []  # list of StoneSprite
-        self.clusters = {}
-        self.illegal_stone = None  # prevent conflicts
+        self.hover_stone = None  # empty stone shown under the cursor
+        self.hover_turn = None  # turn its texture was set for
+        self.grid = None  # lines and star points, one ShapeElementList
+        self.grid_labels = None  # coordinates, one SpriteList
+        self.grid_key = None  # geometry the grid was built for
 
     def setup(self):
         for i in range(self.nr_rows + 1):
@@ -502,21 +499,73 @@ class Table:
                                     center_x,
                                     center_y,
                                     table_position=(i, j))
+                stone.alpha = 0
                 self.stone_sprites.append(stone)
                 self.stone_matrix[i].append(stone)
 
+    # 3rd or 4th line from the edges, plus the center and the middle of the
+    # sides on larger odd tables
+    def get_star_points(self):
+        n = self.nr_rows + 1
+        edge = 3 if n >= 13 else 2
+        lines = [edge, n - 1 - edge]
+        points = [(i, j) for i in lines for j in lines]
+        if n % 2 == 1:
+            center = n // 2
+            points.append((center, center))
+            if n >= 15:
+                points += [(center, k) for k in lines]
+                points += [(k, center) for k in lines]
+        return points
+
+    def build_grid(self):
+        last = self.nr_rows * self.square_size
+        points = []
+        for k in range(self.nr_rows + 1):
+            offset = k * self.square_size
+            points += [
+                (self.start_x, self.start_y + offset),
+                (self.start_x + last, self.start_y + offset),
+                (self.start_x + offset, self.start_y),
+                (self.start_x + offset, self.start_y + last),
+            ]
+        self.grid = arcade.ShapeElementList()
+        self.grid.append(arcade.create_lines(points, GRID_COLOR))
+        star_size = max(self.square_size // 5, 4)
+        for i, j in self.get_star_points():
+            self.grid.append(
+                arcade.create_ellipse_filled(
+                    self.start_x + j * self.square_size,
+                    self.start_y + i * self.square_size,
+                    star_size,
+                    star_size,
+                    GRID_COLOR,
+                ))
+
+        self.grid_labels = arcade.SpriteList()
+        margin = self.stone_size // 2 + 12
+        for k in range(self.nr_rows + 1):
+            offset = k * self.square_size
+            column = GRID_LETTERS[k] if k < len(GRID_LETTERS) else str(k + 1)
+            self.grid_labels.append(
+                create_text_sprite(column, self.start_x + offset,
+                                   self.start_y - margin, GRID_COLOR, 10,
+                                   'center', 'center'))
+            self.grid_labels.append(
+                create_text_sprite(str(k + 1), self.start_x - margin,
+                                   self.start_y + offset, GRID_COLOR, 10,
+                                   'center', 'center'))
+        self.grid_key = (self.start_x, self.start_y, self.square_size,
+                         self.nr_rows)
+
+    # the grid is only built again when the table moves, resizes or changes
+    # its number of rows
     def draw(self):
-        for i in range(self.nr_rows):
-            for j in range(self.nr_rows):
-                center_x = self.start_x + i * self.square_size + self.square_size // 2
-                center_y = self.start_y + j * self.square_size + self.square_size // 2
-                arcade.draw_rectangle_outline(
-                    center_x=center_x,
-                    center_y=center_y,
-                    width=self.square_size,
-                    height=self.square_size,
-                    color=arcade.color.WHITE,
-                )
+        if self.grid_key != (self.start_x, self.start_y, self.square_size,
+                             self.nr_rows):
+            self.build_grid()
+        self.grid.draw()
+        self.grid_labels.draw()
 
     def is_valid_point(self, x, y):
         if x < self.start_x - self.stone_size / 2:
@@ -543,329 +592,75 @@ class Table:
     # get stone from window coordinates
     def get_stone(self, x, y) -> StoneSprite:
         i, j = self.get_stone_raw_location(x, y)
-        if i % 2 == 1 or i % 2 == 1:
+        if i % 2 == 1 or j % 2 == 1:
             return None
         i = i // 2
         j = j // 2
+        if not 0 <= i <= self.nr_rows or not 0 <= j <= self.nr_rows:
+            return None
         return self.stone_matrix[i][j]
 
-    # DEBUG PRINT
-    def afi_cluster(self):
-        for k, v in self.clusters.items():
-            print('liberties', k, v.liberties)
-            print('stone_ids')
-            for stone in v.stones:
-                print(stone.cluster_id)
-
-    def update_cluster_liberties(self, clusters):
-        for cluster in clusters.values():
-            cluster.update_liberties(self)
-
-    def update_cluster_liberties_local(self, clusters, cluster_matrix):
-        for cluster in clusters.values():
-            cluster.update_liberties_local(self, cluster_matrix)
-
-    def is_vertex(self, i, j):
-        return (i, j) in [(0, 0), (0, self.nr_rows), (self.nr_rows, 0),
-                          (self.nr_rows, self.nr_rows)]
-
-    def get_visited_borders(self, i, j) -> set():
-        if self.is_vertex(i, j):
-            return set()
-
-        visited_borders = set()
-        for k in range(len(DIRECTIONS_X)):
-            x = i + DIRECTIONS_X[k]
-            y = j + DIRECTIONS_Y[k]
-            if not self.is_valid_position(x, y):
-                border = None
-                if x < 0:
-                    border = Border.BOTTOM
-                if x > self.nr_rows:
-                    border = Border.TOP
-                if y < 0:
-                    border = Border.LEFT
-                if y > self.nr_rows:
-                    border = Border.RIGHT
-                visited_borders.add(border)
-        return visited_borders
-
-    def try_visit_area(self, i, j, matrix, territory: Territory):
-        territory.visited.add((i, j))
-        territory.borders.update(self.get_visited_borders(i, j))
-
-        for k in range(len(DIRECTIONS_X)):
-            x = i + DIRECTIONS_X[k]
-            y = j + DIRECTIONS_Y[k]
-            if self.is_valid_position(x, y):
-                if matrix[x][y] == StoneType.EMPTY:
-                    if (x, y) in territory.visited:
-                        continue
-                    self.try_visit_area(x, y, matrix, territory)
-
-                matrix[i][j] = matrix[x][y]
-                territory.colors.add(matrix[x][y])
-
-    def is_any_valid_move(self, game):
-        for i in range(self.nr_rows):
-            for j in range(self.nr_rows):
-                if self.stone_matrix[i][
-                        j].type == StoneType.EMPTY and self.is_valid_move(
-                            game, i, j):
-                    return True
-        return False
-
-    def print_scoring_matrix(self, matrix):
-        for i in range(self.nr_rows, -1, -1):
-            print([tp.value for tp in matrix[i]])
+    # cursor is (x, y) or None, only the stone under it and the one that was
+    # under it before change, and only when one of them or the turn changes
+    def update_hover(self, cursor, turn):
+        stone = None
+        if cursor is not None and self.is_valid_point(*cursor):
+            stone = self.get_stone(*cursor)
+        if stone is not None and stone.type != StoneType.EMPTY:
+            stone = None
+        if stone is self.hover_stone and turn == self.hover_turn:
+            return
+
+        if self.hover_stone is not None and self.hover_stone.type == StoneType.EMPTY:
+            self.hover_stone.alpha = 0
+        if stone is not None:
+            stone.texture = Textures.get_turn_texture(turn)
+            stone.alpha = 150
+        self.hover_stone = stone
+        self.hover_turn = turn
+
+    # copy board contents into the sprites
+    def update_sprites(self):
+        for i, stone_row in enumerate(self.stone_matrix):
+            for j, stone in enumerate(stone_row):
+                stone_type = StoneType(self.board.get(i, j))
+                if stone_type != stone.type:
+                    if stone_type == StoneType.EMPTY:
+                        stone.type = stone_type
+                        stone.alpha = 0
+                    else:
+                        stone.assign_type(stone_type)
+        self.hover_turn = None  # the hover is set again on the next frame
 
     def calculate_scores(self, game):
         white_player = game.player1 if game.player1.stone_type == StoneType.WHITE else game.player2
         black_player = game.player2 if white_player == game.player1 else game.player1
 
-        player_by_stone_type = {
-            StoneType.WHITE: white_player,
-            StoneType.BLACK: black_player
-        }
-
-        matrix_types = [[stone.type for stone in row]
-                        for row in self.stone_matrix]
-
-        print("INITIAL SCORE TABLE")
-        self.print_scoring_matrix(matrix_types)
-        print()
-
-        visited_positions = set()
-        for i in range(self.nr_rows + 1):
-            for j in range(self.nr_rows + 1):
-                if matrix_types[i][j] == StoneType.EMPTY and (
-                        i, j) not in visited_positions:
-                    initial_matrix_types = copy.deepcopy(matrix_types)
-
-                    territory = Territory()
-                    self.try_visit_area(i, j, matrix_types, territory)
-                    if not territory.is_valid():
-                        matrix_types = initial_matrix_types
-
-        print("FINAL SCORE TABLE")
-        self.print_scoring_matrix(matrix_types)
-        print()
-
-        for i in range(self.nr_rows + 1):
-            for j in range(self.nr_rows + 1):
-                if matrix_types[i][j] != StoneType.EMPTY:
-                    player_by_stone_type[matrix_types[i][j]].score += 1
+        start = Profiler.start()
+        scores = self.board.score()
+        Profiler.stop_move('scoring', start)
+        white_player.score += scores[StoneType.WHITE.value]
+        black_player.score += scores[StoneType.BLACK.value]
 
     def is_valid_move(self, game, i, j) -> bool:
-        selected_stone = self.stone_matrix[i][j]
-        if selected_stone.type != StoneType.EMPTY:
-            return False
-
-        if selected_stone == self.illegal_stone:
-            return False
-
-        selected_stone = copy.deepcopy(selected_stone)
-        aux_clusters = copy.deepcopy(self.clusters)
-        cluster_matrix = [[stone.cluster_id for stone in row]
-                          for row in self.stone_matrix]
-        type_matrix = [[stone.type for stone in row]
-                       for row in self.stone_matrix]
-
-        xc, yc = selected_stone.table_position
-        stone_liberties = self.get_stone_liberties(xc, yc)
-        aux_clusters[StoneCluster.uuid - 1] = StoneCluster(
-            selected_stone, stone_liberties)
-
-        cluster_matrix[xc][yc] = StoneCluster.uuid - 1
-        type_matrix[xc][yc] = game.turn
-
-        # print("[B] TRY_CLUSTERS")
-        #  Debugger.print_clusters(self.clusters)
-
-        for i in range(len(DIRECTIONS_X)):
-            x = xc + DIRECTIONS_X[i]
-            y = yc + DIRECTIONS_Y[i]
-            if self.is_valid_position(x, y) and type_matrix[x][y] == game.turn:
-                if cluster_matrix[xc][yc] == cluster_matrix[x][y]:
-                    continue
-
-                current_cluster = aux_clusters[cluster_matrix[xc][yc]]
-                neighbor_cluster = aux_clusters[cluster_matrix[x][y]]
-
-                aux_clusters.pop(current_cluster.id)
-                neighbor_cluster.merge(current_cluster)
-                for stone in neighbor_cluster.stones:
-                    xs, ys = stone.table_position
-                    cluster_matrix[xs][ys] = stone.cluster_id
-
-        self.update_cluster_liberties_local(aux_clusters, cluster_matrix)
-
-        StoneCluster.uuid -= 1
-
-        has_caputred = self.try_capture(game, xc, yc, type_matrix,
-                                        cluster_matrix, aux_clusters)
-        # print("[A] TRY_CLUSTERS")
-        # Debugger.print_clusters(self.clusters)
-
-        if has_caputred:
-            return True
-
-        return not (len(aux_clusters[cluster_matrix[xc][yc]].liberties) == 0)
+        start = Profiler.start()
+        legal = self.board.is_legal(self.board.point(i, j), game.turn.value)
+        Profiler.stop_move('legality', start)
+        return legal
 
     # assert is a valid move calling (is_valid_move) first
-    def update_move(self, game, i, j) -> bool:
-        self.illegal_stone = None
-        selected_stone = self.stone_matrix[i][j]
-        selected_stone.type = game.turn
-
-        xc, yc = selected_stone.table_position
-        stone_liberties = self.get_stone_liberties(xc, yc)
-        self.clusters[StoneCluster.uuid - 1] = StoneCluster(
-            selected_stone, stone_liberties)
-        selected_stone.cluster_id = StoneCluster.uuid - 1
-
-        # print("[B] IN UPDATE")
-        # Debugger.print_cluster_stone_matrix(self.stone_matrix)
-        # print("CLUSTERS")
-        # Debugger.print_clusters(self.clusters)
-
-        for i in range(len(DIRECTIONS_X)):
-            x = xc + DIRECTIONS_X[i]
-            y = yc + DIRECTIONS_Y[i]
-            if self.is_valid_position(
-                    x, y) and self.stone_matrix[x][y].type == game.turn:
-
-                neighbor_stone = self.stone_matrix[x][y]
-                neighbor_cluster = self.clusters[neighbor_stone.cluster_id]
-
-                if neighbor_stone.cluster_id == selected_stone.cluster_id:
-                    continue
-
-                current_cluster = self.clusters[selected_stone.cluster_id]
-                self.clusters.pop(current_cluster.id)
-                neighbor_cluster.merge(current_cluster)
-
-        # print("[A] IN UPDATE")
-        # Debugger.print_cluster_stone_matrix(self.stone_matrix)
-        # print("CLUSTERS")
-        # Debugger.print_clusters(self.clusters)
-        self.update_cluster_liberties(self.clusters)
-
-        # print("[A] UPD CLUSTER")
-        # Debugger.print_cluster_stone_matrix(self.stone_matrix)
-
-        # print("CLUSTERS")
-        # Debugger.print_clusters(self.clusters)
-
-        self.capture(game, selected_stone)
-
-        self.update_cluster_liberties(self.clusters)
-
-    # return True if could capture opponent stones
-    def try_capture(self, game, xc, yc, type_matrix, cluster_matrix,
-                    clusters) -> bool:
-        has_captured = False
-        opponent_type = game.get_opponent_player().stone_type
-
-        for i in range(len(DIRECTIONS_X)):
-            x = xc + DIRECTIONS_X[i]
-            y = yc + DIRECTIONS_Y[i]
-            if self.is_valid_position(
-                    x, y) and type_matrix[x][y] == opponent_type:
-                neighbor_cluster = clusters[cluster_matrix[x][y]]
-
-                if len(neighbor_cluster.liberties) == 0:
-                    clusters.pop(neighbor_cluster.id)
-                    for stone in neighbor_cluster.stones:
-                        xs, ys = stone.table_position
-                        type_matrix[xs][ys] = None
-                        cluster_matrix[xs][ys] = None
-
-                    has_captured = True
-
-        return has_captured
-
-    def capture(self, game, selected_stone: StoneSprite) -> bool:
-        opponent_type = game.get_opponent_player().stone_type
-
-        xc, yc = selected_stone.table_position
-        for i in range(len(DIRECTIONS_X)):
-            x = xc + DIRECTIONS_X[i]
-            y = yc + DIRECTIONS_Y[i]
-            if self.is_valid_position(
-                    x, y) and self.stone_matrix[x][y].type == opponent_type:
-
-                neighbor_stone = self.stone_matrix[x][y]
-                neighbor_cluster = self.clusters[neighbor_stone.cluster_id]
-                if len(neighbor_cluster.liberties) == 0:
-                    if len(neighbor_cluster.stones) == 1:
-                        self.illegal_stone = next(iter(
-                            neighbor_cluster.stones))
-                    self.clusters.pop(neighbor_cluster.id)
-                    neighbor_cluster.update_capture_score(game)
-                    neighbor_cluster.clear_captured_stones()
-
-    def is_valid_position(self, x, y):
-        return x >= 0 and x <= self.nr_rows and y >= 0 and y <= self.nr_rows
-
-    def get_stone_liberties(self, xc, yc):
-        stone_liberties = set()
-        for i in range(len(DIRECTIONS_X)):
-            x = xc + DIRECTIONS_X[i]
-            y = yc + DIRECTIONS_Y[i]
-            if self.is_valid_position(
-                    x, y) and self.stone_matrix[x][y].type == StoneType.EMPTY:
-                stone_liberties.add((x, y))
-        return stone_liberties
-
-
-class GraphNode:
-    def __init__(self, id, level: NodeLevel, info, h=None, i=None, j=None):
-        self.id = id
-        self.level = level  # MIN or MAX
-        self.info = info  # StoneSprite matrix
-        self.h = h
-        self.i = i
-        self.j = j
-
-    def __str__(self):
-        text = ""
-        for i in range(len(self.info) - 1, -1, -1):
-            for stone in self.info[i]:
-                text += f"({stone.type.name[0]} {stone.cluster_id}) "
-            text += '\n'
-        return text
+    # play covers the legality check, the captures and the feature updates
+    def update_move(self, game, i, j):
+        start = Profiler.start()
+        captured = self.board.play(self.board.point(i, j), game.turn.value)
+        Profiler.stop_move('play', start, captured=captured)
+        game.get_current_player().score += captured
+        start = Profiler.start()
+        self.update_sprites()
+        Profiler.stop_move('sprites', start)
 
-
-class Heuristic:
-    def has_eye(game, stone, info, stone_type):
-        xc, yc = stone.table_position
-        color = stone_type
-        for i in range(len(DIRECTIONS_X)):
-            x = xc + DIRECTIONS_X[i]
-            y = yc + DIRECTIONS_Y[i]
-            if not game.table.is_valid_position(x, y):
-                return False
-
-            if color != info[x][y].stone_type:
-                return False
-
-        return True
-
-    def calculate_heuristic(game,
-                            info,
-                            stone_type,
-                            heuristic_type=HeuristicType.H1):
-        h = 0
-        if (heuristic_type == HeuristicType.H1):
-            for row in info:
-                for stone in row:
-                    if stone.type == StoneType.EMPTY and Heuristic.has_eye(
-                            game, stone, info, stone_type):
-                        h += 1
-            return h
-
-        return -1
+    def pass_move(self):
+        self.board.pass_move()
 
 
 # DIRECTORY :: BOTS
@@ -877,101 +672,23 @@ class RandomBot:
             return
 
         i, j = 0, 0
-        tries = 0
         if len(Debugger.problem_moves) == 0 or game.moves_played == len(
                 Debugger.problem_moves):
-            nr_rows = game.table.nr_rows
-            while True:
-                i = random.randint(0, nr_rows)
-                j = random.randint(0, nr_rows)
-                if game.table.is_valid_move(game, i, j):
-                    break
-                tries += 1
-                if tries == 20 and not game.table.is_any_valid_move(game):
-                    game.should_end = True
-                    return
+            board = game.table.board
+            legal_moves = board.legal_moves(game.turn.value)
+            if not legal_moves:
+                game.should_end = True
+                return
+            i, j = board.coords(random.choice(legal_moves))
         else:
-            i, j = Debugger.problem_moves[game.moves_played]
+            move = Debugger.problem_moves[game.moves_played]
+            if move is None:
+                game.make_pass()
+                return
+            i, j = move
         game.make_move(i, j)
 
 
-class MinMaxBot:
-    id_cnt = 0
-
-    def __init__(self,
-                 game,
-                 info,
-                 level: NodeLevel,
-                 difficulty=Difficulty.EASY,
-                 heuristic_type=HeuristicType.H1):
-        if difficulty == Difficulty.EASY:
-            self.depth = 3
-        if difficulty == Difficulty.MEDIUM:
-            self.depth = 4
-        if difficulty == Difficulty.HARD:
-            self.depth = 5
-
-        self.game = game
-        info = copy.deepcopy(info)
-        self.graph = GraphNode(MinMaxBot.id_cnt, level, info)
-        MinMaxBot.id_cnt += 1
-        self.heuristic_type = heuristic_type
-        self.dfs(self.graph)
-
-    def dfs(self, node: GraphNode, current_depth=1):
-        if current_depth > self.depth:
-            return
-
-        level = NodeLevel.MAX if node.level == NodeLevel.MIN else NodeLevel.MIN
-        for i in range(self.game.table.nr_rows):
-            for j in range(self.game.table.nr_rows):
-                # TODO another is valid move for local changes
-                if self.game.table.is_valid_move(self.game, i, j):
-                    info = copy.deepcopy(node.info)
-                    print(info[i][j].type)
-                    if current_depth % 2 == 1:
-                        info[i][j].type = self.game.turn
-                    else:
-                        info[i][j].type = self.game.get_opponent_type()
-
-                    h = None
-                    if current_depth == self.depth:
-                        h = Heuristic.calculate_heuristic(
-                            self.game, info, info[i][j].type,
-                            self.heuristic_type)
-
-                    child_node = GraphNode(
-                        MinMaxBot.id_cnt,
-                        info,
-                        level,
-                        h=h,
-                        i=i,
-                        j=j,
-                    )
-                    self.dfs(child_node, current_depth + 1)
-                    MinMaxBot.id_cnt += 1
-
-                    if node.h == None:
-                        node.h = child_node.h
-
-                    if (level == NodeLevel.MAX and node.h < child_node.h) or (
-                            level == NodeLevel.MIN and node.h > child_node.h):
-                        node.info = child_node.info
-                        node.h = child_node.h
-                        node.i = child_node.i
-                        node.j = child_node.j
-
-    def move(self, game):
-        if not game.running:
-            return
-        game.make_move(self.graph.i, self.graph.j)
-
-
-class AlphaBetaBot:
-    def ceva():
-        print()
-
-
 # DIRECTORY :: VIEWS
 class MenuView(arcade.View):
     def __init__(self):
@@ -1041,20 +758,12 @@ class SettingsView(arcade.View):
         self.selected_options = GameOptions()
         self.selected_options.game_type = game_type
 
-        toggler = MyToggler(
-            center_x=self.x_slot * 2,
-            center_y=self.y_slot * 6,
-            height=30,
-            value=self.selected_options.algorithm.value,
-            view=self,
-        )
-
         line_table = 4 if self.selected_options.is_versus_ai() else 6
         line_moves = 3 if self.selected_options.is_versus_ai() else 5
 
         self.buttons = {
             'algorithm':
-            toggler,
+            self.get_buttons_from_enum(Algorithm, 6),
             'difficulty':
             self.get_buttons_from_enum(Difficulty, 5),
             'tabledimension':
@@ -1065,15 +774,18 @@ class SettingsView(arcade.View):
 
     def get_buttons_from_enum(self, enum, line):
         buttons = []
+        step = min(self.x_slot, 3 * self.x_slot // (len(enum) - 1))
 
         for entry in enum:
             name = entry.name.upper()
-            if enum != Difficulty:
+            if enum == Algorithm:
+                name = name.replace('_', '-')
+            elif enum != Difficulty:
                 name = name[3:]
 
             button = MySelectableButton(
                 text=' ' + name + ' ',
-                center_x=self.x_slot * (2 + entry.value),
+                center_x=self.x_slot * 2 + step * entry.value,
                 center_y=self.y_slot * line,
                 option=entry,
                 view=self,
@@ -1113,12 +825,6 @@ class SettingsView(arcade.View):
     def on_hide_view(self):
         self.ui_manager.unregister_handlers()
 
-    def on_mouse_release(self, x: float, y: float, button: int,
-                         modifiers: int):
-        if button == arcade.MOUSE_BUTTON_LEFT:
-            self.selected_options.algorithm = Algorithm(
-                int(self.buttons['algorithm'].value))
-
     def on_draw(self):
         arcade.start_render()
 
@@ -1145,19 +851,6 @@ class SettingsView(arcade.View):
                 font_size=20,
             )
 
-            algorithms = [' Min-Max ', ' Alpha-Beta ']
-
-            arcade.draw_text(
-                algorithms[self.selected_options.algorithm.value],
-                self.x_slot * 3,
-                self.y_slot * 6,
-                arcade.color.WHITE,
-                align='right',
-                anchor_x='center',
-                anchor_y='center',
-                font_size=20,
-            )
-
             arcade.draw_text(
                 'Difficulty',
                 self.x_slot,
@@ -1195,7 +888,7 @@ class SettingsView(arcade.View):
         self.ui_manager.purge_ui_elements()
 
         if self.selected_options.is_versus_ai():
-            self.ui_manager.add_ui_element(self.buttons['algorithm'])
+            self.draw_buttons('algorithm')
             self.draw_buttons('difficulty')
 
         self.draw_buttons('tabledimension')
@@ -1227,18 +920,29 @@ class GameView(arcade.View):
         self.available_moves = int(self.selected_options.moves.name[3:])
         self.winner = None
         self.game_started = False  # True when black make first move
-        self.bot_moving = False
+        self.bot_moving = False  # True while a bot search is in flight
+        self.bot_future = None
+        self.bot_start = None  # Profiler.start() of the bot search in flight
 
+        table_size = min(self.window.width, self.window.height) - 100
         self.table = Table(
-            start_x=int((self.window.width - 500) / 2),
-            start_y=int((self.window.height - 500) / 2),
-            width=500,
-            height=500,
+            start_x=(self.window.width - table_size) // 2,
+            start_y=(self.window.height - table_size) // 2,
+            width=table_size,
+            height=table_size,
             dimension=selected_options.tabledimension,
         )
+        self.record = GameRecord(self.table.board.size)  # moves of this game
+        self.game_log = get_game_log()
+        if self.game_log is not None:
+            self.game_log.start_game(
+                self.table.board.size,
+                game_type=selected_options.game_type.name,
+                algorithm=selected_options.algorithm.name,
+                difficulty=selected_options.difficulty.name)
         self.player1 = Player(StoneType.BLACK)
         self.player2 = Player(StoneType.WHITE)
-        self.cursor = StoneSprite(5, 0, 0, (-1, -1))
+        self.cursor = None  # (x, y) of the mouse, None until it moves
 
         self.turn = StoneType.BLACK  # decide player turn
         self.running = True  # if game is running
@@ -1337,13 +1041,17 @@ class GameView(arcade.View):
 
     def on_hide_view(self):
         self.ui_manager.unregister_handlers()
+        self.cancel_bot_move()
 
     def on_mouse_motion(self, x, y, dx, dy):
         if not self.running or self.selected_options.game_type == GameType.AVA:
             return
 
-        self.cursor.center_x = x
-        self.cursor.center_y = y
+        self.cursor = (x, y)
+
+    def on_key_press(self, symbol: int, modifiers: int):
+        if symbol == arcade.key.F3 and Profiler.enabled:
+            Profiler.overlay = not Profiler.overlay
 
     def on_mouse_press(self, x: float, y: float, button: int, modifiers: int):
         if not self.running or self.bot_moving:
@@ -1361,29 +1069,17 @@ class GameView(arcade.View):
                 return
 
             i, j = self.table.get_stone_location(x, y)
-            # print("ULTIMA MUTAREEEEEEEEEEEEEEEEEE")
-
-            # print("[B] CLUSTER_MATRIX")
-            # Debugger.print_cluster_stone_matrix(self.table.stone_matrix)
-
-            # print("[B] CLUSTERS")
-            # Debugger.print_clusters(self.table.clusters)
-
             if self.table.is_valid_move(self, i, j):
-                # print("[A] CLUSTER_MATRIX")
-                # Debugger.print_cluster_stone_matrix(self.table.stone_matrix)
-
-                # print("[A] CLUSTERS")
-                # Debugger.print_clusters(self.table.clusters)
                 self.make_move(i, j)
 
     def make_move(self, i, j):
         if self.running == False:
             return
-        Debugger.add_move(i, j, self.turn)
-        #Debugger.write_moves('moves.out')
-        #Debugger.write_move_pairs('pairs.out')
+        self.add_record(i, j)
+        #Debugger.write_sgf('game.sgf', self.record)
+        start = Profiler.start()
         self.table.update_move(self, i, j)
+        Profiler.stop_move('update_move', start)
         self.game_started = True
         self.moves_played += 1
         if self.moves_played == self.available_moves:
@@ -1391,6 +1087,34 @@ class GameView(arcade.View):
         else:
             self.next_turn()
 
+    def make_pass(self):
+        if self.running == False:
+            return
+        self.add_record(None, None)
+        self.table.pass_move()
+        self.moves_played += 1
+        if self.moves_played == self.available_moves:
+            self.should_end = True
+        else:
+            self.next_turn()
+
+    # i, j are None for a pass
+    def add_record(self, i, j):
+        move = None if i is None else (i, j)
+        self.record.add_move(self.turn.value, move)
+        if self.game_log is not None:
+            self.game_log.add_move(self.turn.value, move)
+
+    # sgf style, 'B+3', 'W+R' or '0' for a draw
+    def get_result(self):
+        if self.winner is None:
+            return '0'
+        loser = self.player2 if self.winner == self.player1 else self.player1
+        color = 'B' if self.winner.stone_type == StoneType.BLACK else 'W'
+        if loser.has_resigned:
+            return color + '+R'
+        return f"{color}+{self.winner.score - loser.score}"
+
     def get_winner(self):
         if self.player1.has_resigned or self.player2.has_resigned:
             return self.player2 if self.player1.has_resigned else self.player1
@@ -1411,83 +1135,132 @@ class GameView(arcade.View):
         return self.get_opponent_player().stone_type
 
     def on_update(self, delta_time):
+        start = Profiler.start()
+        self.update_frame(delta_time)
+        Profiler.stop_frame('on_update', start)
+
+    def update_frame(self, delta_time):
         if self.running and self.game_started:
             self.get_current_player().time.increment(delta_time)
-        stones_hit = arcade.check_for_collision_with_list(
-            self.cursor, self.table.stone_sprites)
-
-        for stone_row in self.table.stone_matrix:
-            for stone in stone_row:
-                if stone.type == StoneType.EMPTY:
-                    stone.alpha = 0
-                    stone.texture = Textures.get_turn_texture(self.turn)
-                    if stone in stones_hit:
-                        stone.alpha = 150
-                else:
-                    stone.alpha = 255
+        self.table.update_hover(self.cursor, self.turn)
+        if self.game_log is not None:
+            self.game_log.maybe_flush()
 
         if self.selected_options.game_type == GameType.PVP:
             return
 
-        if not self.bot_moving:
-            if self.selected_options.game_type == GameType.PVA and self.player2.stone_type == self.turn:
+        if self.bot_moving:
+            if self.bot_future.done():
+                self.finish_bot_move()
+            return
 
-                self.bot_moving = True
-                RandomBot.move(self)
-                # TODO proper bots implement
+        if self.selected_options.game_type == GameType.PVA and self.player2.stone_type == self.turn:
+            self.start_bot_move()
 
-                # if self.selected_options.algorithm == Algorithm.MIN_MAX:
-                #     MinMaxBot(self, self.table.stone_matrix, NodeLevel.MAX,
-                #               self.selected_options.difficulty,
-                #               HeuristicType.H1)
-                # else:
-                #     AlphaBetaBot()
-                self.bot_moving = False
+        if self.selected_options.game_type == GameType.AVA:
+            self.start_bot_move()
 
-            if self.selected_options.game_type == GameType.AVA:
-                self.bot_moving = True
-                RandomBot.move(self)
-                self.bot_moving = False
+    def start_bot_move(self):
+        if not self.running:
+            return
+        if len(Debugger.problem_moves) > 0:
+            RandomBot.move(self)  # replays the recorded moves
+            return
 
-    def draw_moves(self):
-        arcade.draw_text(
-            text=f"MOVES AVAILALBE: {self.available_moves - self.moves_played}",
-            start_x=self.window.width / 2,
-            start_y=self.window.height - 30,
-            color=arcade.color.WHITE,
-            font_size=20,
-            anchor_x='center',
-            anchor_y='center',
-            align='center',
+        # min-max and alpha-beta split their root moves over BOT_WORKERS
+        workers = None
+        if self.selected_options.algorithm != Algorithm.MCTS:
+            workers = BOT_WORKERS
+
+        self.bot_moving = True
+        self.bot_start = Profiler.start()
+        self.bot_future = get_bot_executor().submit(
+            search_move,
+            self.table.board.get_snapshot(),
+            self.selected_options.algorithm,
+            self.selected_options.difficulty,
+            HeuristicType.H1,
+            workers,
         )
 
-    def on_draw(self):
-        arcade.start_render()
-
-        if self.turn == StoneType.BLACK:
-            Textures.black_stone.draw_sized(self.player1.column_x, 300, 50, 50)
-        else:
-            Textures.white_stone.draw_sized(self.player2.column_x, 300, 50, 50)
-
-        self.table.draw()
-        self.table.stone_sprites.draw()
+    def finish_bot_move(self):
+        try:
+            move, stats = self.bot_future.result()
+        except Exception as error:  # the bot passes instead of a crash
+            print(f"bot search failed: {error!r}")
+            stop_bot_executor()  # a broken pool takes no more searches
+            self.bot_future = None
+            self.bot_moving = False
+            self.make_pass()
+            return
+        Profiler.add_bot(stats, self.bot_start)
+        self.bot_future = None
+        self.bot_moving = False
+        if not self.running:
+            return
+        if move is None:
+            self.should_end = True
+            return
+        self.make_move(*move)
+
+    # a search left over from this game would hold up the next one, it is
+    # dropped while queued and killed while running
+    def cancel_bot_move(self):
+        if self.bot_future is not None and not self.bot_future.cancel(
+        ) and not self.bot_future.done():
+            stop_bot_executor()
+        self.bot_future = None
+        self.bot_moving = False
 
-        self.draw_moves()
+    def create_texts(self):
+        self.hud = create_hud()
+        self.end_hud = create_hud()  # above the end game box
+        self.moves_text = HudText(self.hud, self.window.width / 2,
+                                  self.window.height - 30, arcade.color.WHITE,
+                                  20)
+        self.end_text = HudText(self.end_hud, 400, 350, arcade.color.WHITE, 18)
 
-        self.player1.draw(
+        self.player1.create_texts(
+            self.hud,
             self.player_name_y,
             self.player_score_y,
             self.player_time_y,
             arcade.color.AQUA,
         )
-
-        self.player2.draw(
+        self.player2.create_texts(
+            self.hud,
             self.window.height - self.player_name_y,
             self.window.height - self.player_time_y,
             self.window.height - self.player_score_y,
             arcade.color.PINK,
         )
 
+    def draw_moves(self):
+        self.moves_text.set(
+            f"MOVES AVAILALBE: {self.available_moves - self.moves_played}")
+
+    def on_draw(self):
+        start = Profiler.start()
+        self.draw_frame()
+        Profiler.stop_frame('on_draw', start)
+        Profiler.draw_overlay(10, self.window.height - 60)
+
+    def draw_frame(self):
+        arcade.start_render()
+
+        if self.turn == StoneType.BLACK:
+            Textures.black_stone.draw_sized(self.player1.column_x, 300, 50, 50)
+        else:
+            Textures.white_stone.draw_sized(self.player2.column_x, 300, 50, 50)
+
+        self.table.draw()
+        self.table.stone_sprites.draw()
+
+        self.draw_moves()
+        self.player1.update_texts()
+        self.player2.update_texts()
+        self.hud.draw()
+
         self.end_game()
 
     def end_game(self):
@@ -1497,6 +1270,11 @@ class GameView(arcade.View):
             self.ui_manager.add_ui_element(self.end_buttons['play_again'])
             self.ui_manager.add_ui_element(self.end_buttons['go_back'])
             self.winner = self.get_winner()
+            self.record.result = self.get_result()
+            if self.game_log is not None:
+                self.game_log.end_game(self.record.result,
+                                       black=self.player1.score,
+                                       white=self.player2.score)
 
         self.should_end = False
         if self.running == False:
@@ -1505,6 +1283,7 @@ class GameView(arcade.View):
     def setup(self):
         self.ui_manager.purge_ui_elements()
         self.table.setup()
+        self.create_texts()
         self.show_buttons()
 
     def next_turn(self):
@@ -1531,20 +1310,16 @@ class GameView(arcade.View):
             color=arcade.color.BLACK_LEATHER_JACKET,
         )
 
-        arcade.draw_text(
-            text=text,
-            start_x=400,
-            start_y=350,
-            color=arcade.color.WHITE,
-            font_size=18,
-            align='center',
-            anchor_x='center',
-            anchor_y='center',
-        )
+        self.end_text.set(text)
+        self.end_hud.draw()
 
 
 # MAIN
 if __name__ == '__main__':
+    Profiler.setup(PROFILE_OVERLAY, PROFILE_TRACE_PATH)
     window = arcade.Window(title=WINDOW_TITLE)
     window.show_view(MenuView())
-    arcade.run()
\ No newline at end of file
+    arcade.run()
+    stop_bot_executor()  # closing doesn't wait for a search to end
+    if game_log is not None:
+        game_log.close()
\ No newline at end of file
@@ -0,0 +1,164 @@
+import argparse
+import ast
+import json
+import sys
+import time
+from engine import BLACK, get_opponent
+from sgf import GameRecord, load_games
+
+# DIRECTORY :: GAMES
+
+
+# old Debugger move pairs, "[(i, j), ...]", colors alternate from black
+def read_move_pairs(path, size):
+    with open(path, 'r') as f:
+        pairs = ast.literal_eval(f.read())
+    record = GameRecord(size)
+    color = BLACK
+    for move in pairs:
+        record.add_move(color, None if move is None else tuple(move))
+        color = get_opponent(color)
+    return record
+
+
+def load_records(paths, size=None):
+    for path in paths:
+        if path.endswith('.sgf'):
+            yield from load_games(path)
+        elif size is None:
+            raise ValueError(f"{path} has no board size, pass --size")
+        else:
+            yield read_move_pairs(path, size)
+
+
+# DIRECTORY :: REPLAY
+
+
+class ReplayError(Exception):
+    pass
+
+
+def get_board_str(board):
+    return ''.join('.XO'[board.points[p]] for p in board.all_points)
+
+
+def get_checkpoint(board, move):
+    return {
+        'move': move,
+        'board': get_board_str(board),
+        'captures': board.captures[1:],
+    }
+
+
+# plays a record through the rules engine, every move has to be legal, the
+# board is compared with the expected checkpoints ({'move', 'board',
+# 'captures'} after that many moves) and the final score with `score`,
+# `every` also returns a checkpoint every that many moves
+def replay_game(record, checkpoints=(), score=None, every=None):
+    board = record.to_board(0)
+    expected = {checkpoint['move']: checkpoint for checkpoint in checkpoints}
+    seen = []
+    for index, (color, move) in enumerate(record.moves, 1):
+        if move is None:
+            board.turn = color
+            board.pass_move()
+        else:
+            p = board.point(*move)
+            if not board.is_legal(p, color):
+                raise ReplayError(f"move {index} {move} is illegal")
+            board.play(p, color)
+        if index in expected or (every and index % every == 0):
+            checkpoint = get_checkpoint(board, index)
+            if index in expected and checkpoint != expected[index]:
+                raise ReplayError(
+                    f"move {index}: expected {expected[index]}, "
+                    f"got {checkpoint}")
+            seen.append(checkpoint)
+
+    final_score = board.score()[1:]
+    if score is not None and final_score != score:
+        raise ReplayError(f"expected score {score}, got {final_score}")
+    return {
+        'moves': len(record.moves),
+        'checkpoints': seen,
+        'score': final_score,
+    }
+
+
+# replays every record, against the expected lines when given, returns the
+# results and the failures as (game, message)
+def replay_games(records, expected=None):
+    results = []
+    failures = []
+    for index, record in enumerate(records):
+        line = {}
+        if expected is not None:
+            line = next(expected, None)
+            if line is None:
+                failures.append((index, "no expected line"))
+                break
+        try:
+            result = replay_game(record, line.get('checkpoints', ()),
+                                 line.get('score'))
+        except ReplayError as e:
+            failures.append((index, str(e)))
+            continue
+        results.append(result)
+    return results, failures
+
+
+# one JSON line per game with its checkpoints and final score
+def record_expected(records, output, every):
+    with open(output, 'w') as f:
+        for index, record in enumerate(records):
+            result = replay_game(record, every=every)
+            f.write(
+                json.dumps({
+                    'game': index,
+                    'checkpoints': result['checkpoints'],
+                    'score': result['score'],
+                }) + '\n')
+            yield result
+
+
+def read_expected(path):
+    with open(path, 'r') as f:
+        for line in f:
+            yield json.loads(line)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description="Replays recorded games through the rules engine.")
+    parser.add_argument('paths', nargs='+', help="SGF or move pair files")
+    parser.add_argument('--size',
+                        type=int,
+                        default=None,
+                        help="points per side of move pair files")
+    parser.add_argument('--expected', help="JSON lines to check against")
+    parser.add_argument('--record', help="write the expected JSON lines")
+    parser.add_argument('--every',
+                        type=int,
+                        default=20,
+                        help="moves between recorded checkpoints")
+    args = parser.parse_args()
+    if args.size is None and not all(p.endswith('.sgf') for p in args.paths):
+        parser.error("move pair files need --size")
+
+    records = load_records(args.paths, args.size)
+    start = time.perf_counter()
+    if args.record:
+        results = list(record_expected(records, args.record, args.every))
+        failures = []
+    else:
+        expected = read_expected(args.expected) if args.expected else None
+        results, failures = replay_games(records, expected)
+    elapsed = time.perf_counter() - start
+
+    moves = sum(result['moves'] for result in results)
+    print(f"{len(results) + len(failures)} games, {moves} moves in "
+          f"{elapsed:.2f} s ({moves / max(elapsed, 1e-9):.0f} moves/s)")
+    for index, message in failures:
+        print(f"game {index}: {message}")
+    if failures:
+        sys.exit(1)
@@ -0,0 +1,262 @@
+import re
+import string
+from engine import BLACK, WHITE, Board
+
+# DIRECTORY :: CONSTANTS
+COLORS = {'B': BLACK, 'W': WHITE}
+COLOR_NAMES = {BLACK: 'B', WHITE: 'W'}
+LETTERS = string.ascii_lowercase + string.ascii_uppercase  # sgf coordinates
+CHUNK_SIZE = 1 << 16  # characters read at a time
+MOVES_PER_LINE = 10
+
+# a bracket, a semicolon or a property with all its values, values can hold
+# escaped brackets and line breaks
+TOKEN = re.compile(
+    r'\s*(?:([();])|([A-Za-z]+)\s*((?:\[[^\]\\]*(?:\\.[^\]\\]*)*\]\s*)+))',
+    re.S)
+VALUE = re.compile(r'\[([^\]\\]*(?:\\.[^\]\\]*)*)\]', re.S)
+ESCAPE = re.compile(r'\\(\r\n|\n\r|.)', re.S)
+NON_SPACE = re.compile(r'\S')
+
+# DIRECTORY :: GAMES
+
+
+# one game, moves are (color, (i, j)) with None for a pass, rows count from
+# the bottom like the table while sgf rows count from the top
+class GameRecord:
+    def __init__(self,
+                 size,
+                 moves=None,
+                 result=None,
+                 komi=0.0,
+                 setup=None,
+                 properties=None):
+        self.size = size
+        self.moves = moves if moves is not None else []
+        self.result = result  # e.g. 'B+3', 'W+R', '0' for a draw
+        self.komi = komi
+        self.setup = setup if setup is not None else []  # (color, (i, j))
+        self.properties = properties or {}  # other root properties
+
+    def add_move(self, color, move):
+        self.moves.append((color, move))
+
+    # board after the setup stones and the first `count` moves, moves are
+    # played as recorded, without checking that they are legal
+    def to_board(self, count=None):
+        board = Board(self.size)
+        for color, (i, j) in self.setup:
+            board.play(board.point(i, j), color)
+        board.turn = self.moves[0][0] if self.moves else BLACK
+        for color, move in self.moves[:count]:
+            if move is None:
+                board.turn = color
+                board.pass_move()
+            else:
+                board.play(board.point(*move), color)
+        return board
+
+
+# DIRECTORY :: COORDINATES
+
+
+def to_sgf_point(size, move):
+    if move is None:
+        return ''
+    i, j = move
+    return LETTERS[j] + LETTERS[size - 1 - i]
+
+
+# '' is a pass, so is 'tt' on boards up to 19x19 points (old files)
+def from_sgf_point(size, value):
+    if value == '' or (value == 'tt' and size <= 19):
+        return None
+    if len(value) != 2:
+        raise ValueError(f"bad SGF point {value!r}")
+    j = LETTERS.find(value[0])
+    i = size - 1 - LETTERS.find(value[1])
+    if not 0 <= j < size or not 0 <= i < size:
+        raise ValueError(f"SGF point {value!r} is off a {size}x{size} board")
+    return i, j
+
+
+# setup stones can be listed as rectangles, e.g. 'aa:cc'
+def from_sgf_points(size, values):
+    moves = []
+    for value in values:
+        if ':' not in value:
+            moves.append(from_sgf_point(size, value))
+            continue
+        (i1, j1), (i2, j2) = (from_sgf_point(size, v) for v in value.split(':'))
+        moves += [(i, j) for i in range(min(i1, i2), max(i1, i2) + 1)
+                  for j in range(min(j1, j2), max(j1, j2) + 1)]
+    return moves
+
+
+# DIRECTORY :: READER
+
+
+def unescape(value):
+    return ESCAPE.sub(lambda m: '' if m.group(1)[0] in '\r\n' else m.group(1),
+                      value)
+
+
+# ('(',) (')',) (';',) or (name, [values]) from a file read in chunks, only
+# the unread part of the current chunk is kept
+def get_tokens(f, chunk_size=CHUNK_SIZE):
+    buffer = ''
+    position = 0
+    eof = False
+    while True:
+        match = TOKEN.match(buffer, position)
+        if match is not None and not eof:
+            # a token at the end of the buffer may go on in the next chunk,
+            # so may a property while another value follows it
+            following = NON_SPACE.search(buffer, match.end())
+            if following is None or (match.group(2) is not None
+                                     and following.group() == '['):
+                match = None
+        if match is not None:
+            position = match.end()
+            if match.group(1) is not None:
+                yield (match.group(1), )
+            else:
+                name = ''.join(c for c in match.group(2) if c.isupper())
+                yield name, [unescape(v) for v in VALUE.findall(match.group(3))]
+        elif not eof:
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buffer = buffer[position:] + chunk
+            position = 0
+        elif buffer[position:].strip():
+            raise ValueError(f"bad SGF near {buffer[position:position + 20]!r}")
+        else:
+            return
+
+
+# root node properties are kept in the record apart from the ones it maps
+def get_record(nodes):
+    if not nodes:
+        raise ValueError("SGF game tree without nodes")
+    root = nodes[0]
+    if root.get('GM', ['1'])[0] != '1':
+        raise ValueError(f"SGF game type {root['GM'][0]} is not go")
+    size = root.get('SZ', ['19'])[0]
+    if ':' in size:
+        raise ValueError(f"SGF board {size} is not square")
+    size = int(size)
+    record = GameRecord(
+        size,
+        result=root['RE'][0] if 'RE' in root else None,
+        komi=float(root['KM'][0]) if 'KM' in root else 0.0,
+        properties={
+            name: values
+            for name, values in root.items()
+            if name not in ('SZ', 'RE', 'KM', 'AB', 'AW', 'B', 'W')
+        })
+    for node in nodes:
+        for name, color in COLORS.items():
+            if 'A' + name in node:
+                if record.moves:
+                    raise ValueError("SGF setup stones after the first move")
+                record.setup += [
+                    (color, move)
+                    for move in from_sgf_points(size, node['A' + name])
+                ]
+            if name in node:
+                record.add_move(color, from_sgf_point(size, node[name][0]))
+    return record
+
+
+# GameRecord of every game of a collection, one game in memory at a time,
+# variations are skipped and only the main line is kept
+def read_games(f, chunk_size=CHUNK_SIZE):
+    depth = 0
+    skip_depth = None  # depth of the variation being skipped
+    has_child = []  # by depth, if the main line already went down a variation
+    nodes = []
+    for token in get_tokens(f, chunk_size):
+        kind = token[0]
+        if kind == '(':
+            if depth > 0 and skip_depth is None and has_child[-1]:
+                skip_depth = depth + 1
+            if depth > 0:
+                has_child[-1] = True
+            has_child.append(False)
+            depth += 1
+        elif kind == ')':
+            if depth == 0:
+                raise ValueError("unbalanced ')' in SGF")
+            has_child.pop()
+            depth -= 1
+            if skip_depth is not None and depth < skip_depth:
+                skip_depth = None
+            if depth == 0:
+                yield get_record(nodes)
+                nodes = []
+        elif depth == 0:
+            raise ValueError("SGF node outside of a game tree")
+        elif skip_depth is not None:
+            continue
+        elif kind == ';':
+            nodes.append({})
+        elif not nodes:
+            raise ValueError("SGF property before the first node")
+        else:
+            nodes[-1][kind] = token[1]
+    if depth > 0:
+        raise ValueError("SGF ends inside a game tree")
+
+
+def load_games(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        yield from read_games(f)
+
+
+# DIRECTORY :: WRITER
+
+
+def escape(value):
+    return str(value).replace('\\', '\\\\').replace(']', '\\]')
+
+
+def get_property_str(name, values):
+    return name + ''.join(f"[{escape(v)}]" for v in values)
+
+
+def get_game_str(record):
+    properties = {'FF': ['4'], 'GM': ['1'], 'CA': ['UTF-8']}
+    properties.update(record.properties)
+    properties['SZ'] = [record.size]
+    if record.komi:
+        properties['KM'] = [record.komi]
+    if record.result is not None:
+        properties['RE'] = [record.result]
+    for color, name in COLOR_NAMES.items():
+        stones = [move for c, move in record.setup if c == color]
+        if stones:
+            properties['A' + name] = [
+                to_sgf_point(record.size, move) for move in stones
+            ]
+    parts = ['(;']
+    parts += [
+        get_property_str(name, values) for name, values in properties.items()
+    ]
+    for index, (color, move) in enumerate(record.moves):
+        if index % MOVES_PER_LINE == 0:
+            parts.append('\n')
+        parts.append(
+            f";{COLOR_NAMES[color]}[{to_sgf_point(record.size, move)}]")
+    parts.append(')\n')
+    return ''.join(parts)
+
+
+# games can come from a generator, each is written as soon as it arrives
+def write_games(f, games):
+    for record in games:
+        f.write(get_game_str(record))
+
+
+def save_games(path, games):
+    with open(path, 'w', encoding='utf-8') as f:
+        write_games(f, games)
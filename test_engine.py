@@ -0,0 +1,310 @@
+import random
+import tracemalloc
+import pytest
+from benchmark import is_legal_by_copy, territory_by_recursion
+from engine import (BLACK, EMPTY, PASS, WHITE, Algorithm, AlphaBetaBot,
+                    BatchPlayouts, Board, BoundType, Difficulty, Heuristic,
+                    HeuristicType, MinMaxBot, NodeLevel, ParallelSearch,
+                    PlayoutBoard, TranspositionTable, create_bot,
+                    get_mask_points, get_worker_transposition_table,
+                    search_root_moves)
+
+# DIRECTORY :: HELPERS
+
+
+# boards from seeded random games, every `step` moves
+def get_positions(size, games=20, moves=400, step=10, seed=0):
+    rng = random.Random(seed)
+    positions = []
+    for _ in range(games):
+        board = Board(size)
+        for move in range(moves):
+            legal_moves = board.legal_moves()
+            if not legal_moves:
+                break
+            board.play(rng.choice(legal_moves))
+            if move % step == step - 1:
+                positions.append(board.copy())
+    return positions
+
+
+def get_state(board):
+    groups = {}
+    for p in board.all_points:
+        if board.points[p] in (BLACK, WHITE):
+            root = board.find(p)
+            groups[p] = (frozenset(board.get_group_stones(p)),
+                         board.liberties[root], board.group_size[root],
+                         board.group_hash[root])
+    return (bytes(board.points), board.hash, frozenset(board.history),
+            tuple(map(frozenset, board.history_by_size)), board.turn,
+            tuple(board.captures), frozenset(board.roots), board.empty_mask,
+            board.stone_count, groups)
+
+
+# black has no legal move, white has two eyes on a 3x3 board
+def get_no_move_board():
+    board = Board(3)
+    for i, j in ((0, 1), (0, 2), (1, 0), (1, 1), (1, 2), (2, 0), (2, 1)):
+        board.play(board.point(i, j), WHITE)
+    board.turn = BLACK
+    return board
+
+
+# DIRECTORY :: BOARD
+
+
+# incremental zobrist hash must match a full recomputation at every move
+def test_hashes(size=11, games=20, moves=400, seed=0):
+    rng = random.Random(seed)
+    for _ in range(games):
+        board = Board(size)
+        for _ in range(moves):
+            legal_moves = board.legal_moves()
+            if not legal_moves:
+                break
+            board.play(rng.choice(legal_moves))
+            assert board.hash == board.compute_hash(), f"hash mismatch\n{board}"
+
+
+# a random line played and taken back must restore the exact prior state
+def test_undo(size=9, games=50, moves=300, seed=0):
+    rng = random.Random(seed)
+    for _ in range(games):
+        board = Board(size)
+        initial_state = get_state(board)
+        for _ in range(moves):
+            legal_moves = board.legal_moves()
+            board.play(rng.choice(legal_moves) if legal_moves else PASS)
+            if rng.random() < 0.2:
+                state = get_state(board)
+                line = rng.randint(1, 12)
+                for _ in range(line):
+                    legal_moves = board.legal_moves()
+                    board.play(rng.choice(legal_moves) if legal_moves else PASS)
+                for _ in range(line):
+                    board.undo()
+                assert get_state(board) == state, f"undo mismatch\n{board}"
+        while board.undo_stack:
+            board.undo()
+        assert get_state(board) == initial_state, "undo to start mismatch"
+
+
+# legality from the neighbor liberties must agree with copying the board
+# and trying the move
+def test_legality_by_copy(size=9):
+    for board in get_positions(size, games=4, moves=120, step=10):
+        for p in board.all_points:
+            assert board.is_legal(p) == is_legal_by_copy(board, p), \
+                f"legality mismatch at {board.coords(p)}\n{board}"
+
+
+# the iterative territory fill must agree with the recursive one it replaced
+def test_territory(size=20):
+    for board in get_positions(size, games=10, moves=400, step=40):
+        assert board.territory() == territory_by_recursion(board), \
+            f"territory mismatch\n{board}"
+
+
+# whole board legal mask must agree with the scalar check
+def test_legal_mask(size=11):
+    for board in get_positions(size):
+        for color in (BLACK, WHITE):
+            mask = board.get_legal_mask(color)
+            for p in board.all_points:
+                assert bool(mask >> p & 1) == board.is_legal(p, color), \
+                    f"mask mismatch at {board.coords(p)}\n{board}"
+
+
+# features kept by play / undo must match a full recount of the points
+def test_features(size=9, games=20, moves=300, seed=0):
+    np = pytest.importorskip('numpy')
+    rng = random.Random(seed)
+    for _ in range(games):
+        board = Board(size)
+        board.track_features()
+        for _ in range(moves):
+            legal_moves = board.legal_moves()
+            board.play(rng.choice(legal_moves) if legal_moves else PASS)
+            if rng.random() < 0.3:
+                board.undo()
+            eyes, liberty_points = Heuristic.get_features(
+                np.frombuffer(board.points, dtype=np.int8), board.stride)
+            assert board.eyes[1:] == eyes[0, 1:].tolist(), f"eyes\n{board}"
+            assert board.liberty_points[1:] == liberty_points[0, 1:].tolist(
+            ), f"liberty points\n{board}"
+
+
+# an untracked board is counted on every evaluation and searched on a tracked
+# copy, it never starts tracking behind the caller
+def test_untracked_features(size=7):
+    for board in get_positions(size, games=3, moves=40, step=10):
+        tracked = board.copy()
+        tracked.track_features()
+        assert board.get_features() == (tracked.eyes, tracked.liberty_points)
+        for heuristic_type in (HeuristicType.H1, HeuristicType.H2):
+            assert Heuristic.evaluate(board, BLACK, heuristic_type
+                                      ) == Heuristic.evaluate(
+                                          tracked, BLACK, heuristic_type)
+        state = get_state(board)
+        bot = AlphaBetaBot(board, max_depth=2)
+        assert board.eyes is None and get_state(board) == state
+        assert bot.board is not board and bot.board.eyes is not None
+
+
+# every difficulty stops near its deadline on the largest table and still
+# answers with a legal move from the deepest finished iteration
+def test_min_max_deadline(size=20):
+    board = Board(size)
+    bot = MinMaxBot(board, time_limit=0.2)
+    assert bot.elapsed < 0.2 + 0.5
+    assert 1 <= bot.depth_reached < bot.max_depth
+    assert board.is_legal(bot.best_move, board.turn)
+    assert board.undo_stack == [] and board.stone_count == 0
+
+
+# a playout board keeps the same stones, groups, captures and hash as the
+# board it was copied from, only superko is left to the full board
+def test_playout_board(size=9, games=30, moves=300, seed=0):
+    rng = random.Random(seed)
+    for board in get_positions(size, games=3, moves=60, step=20):
+        for _ in range(games // 3):
+            playout_board = PlayoutBoard(board)
+            full = board.copy()
+            for _ in range(moves):
+                color = full.turn
+                legal_moves = [
+                    p for p in full.all_points
+                    if playout_board.is_legal(p, color)
+                ]
+                for p in full.legal_moves():
+                    assert p in legal_moves or p == playout_board.ko
+                p = rng.choice(legal_moves) if legal_moves else PASS
+                assert playout_board.play(p, color) == full.play(p, color)
+                assert bytes(playout_board.points) == bytes(full.points)
+                assert playout_board.hash == full.hash
+                assert playout_board.captures == full.captures
+                assert sorted(playout_board.empty) == get_mask_points(
+                    full.empty_mask)
+                for q in full.all_points:
+                    if full.points[q] != EMPTY:
+                        assert playout_board.liberties[playout_board.find(
+                            q)] == full.liberties[full.find(q)], f"{full}"
+
+
+# DIRECTORY :: BOTS
+
+
+# peak memory of a depth 4 min-max search must not grow with the tree
+def test_search_memory(limit_kb=64):
+    board = Board(5)
+    for i, j in ((1, 1), (2, 2), (1, 2), (3, 3), (2, 1), (3, 2)):
+        board.play(board.point(i, j))
+    table = TranspositionTable(1)  # allocated before tracing, it is bounded
+
+    tracemalloc.start()
+    MinMaxBot(board,
+              NodeLevel.MAX,
+              Difficulty.MEDIUM,
+              transposition_table=table,
+              time_limit=float('inf'))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert peak < limit_kb * 1024, f"depth 4 search peaked at {peak} bytes"
+
+
+# batched playouts must keep their group labels, liberties, empty points and
+# hashes exact and never leave a group without liberties, checked against
+# the scalar board
+def test_batch_playouts(size=9, count=64, seed=0):
+    pytest.importorskip('numpy')
+    playouts = BatchPlayouts(Board(size), count, seed)
+    while playouts.moves < playouts.max_moves and len(playouts.ids):
+        playouts.step()
+        assert (playouts.labels == playouts.get_labels()).all(), "bad labels"
+        stones = (playouts.boards == BLACK) | (playouts.boards == WHITE)
+        groups = (playouts.labels + playouts.get_base())[stones]
+        liberties = playouts.get_liberties().reshape(-1, 3)[groups]
+        assert (playouts.liberties.reshape(-1, 3)[groups] == liberties
+                ).all(), "bad liberties"
+        assert (playouts.atari.reshape(-1)[groups] == BatchPlayouts.in_atari(
+            liberties)).all(), "bad atari"
+        empty, empty_count, _ = playouts.get_empty()
+        for k, stones in enumerate(playouts.boards):
+            board = Board(size)
+            for p in board.all_points:
+                board.points[p] = stones[p]
+            board.rebuild_groups()
+            for root in board.roots:
+                assert board.get_liberty_count(root) > 0, f"dead group\n{board}"
+            assert playouts.hashes[k] == board.compute_hash(), "bad hash"
+            live = playouts.empty[k, :playouts.empty_count[k]]
+            assert sorted(live) == list(empty[k, :empty_count[k]])
+            assert (playouts.empty_slot[k, live] == range(len(live))).all()
+        playouts.keep(playouts.passes < 2)
+
+
+def test_alpha_beta_without_legal_moves():
+    board = get_no_move_board()
+    assert board.legal_moves() == []
+    state = get_state(board)
+    bot = AlphaBetaBot(board, max_depth=2)
+    assert bot.get_move() is None
+    assert get_state(board) == state
+
+
+# bounds left in a table by another search are not scores, min-max must
+# only take the exact entries
+def test_min_max_ignores_bounds(size=5):
+    for board in get_positions(size, games=5, moves=12, step=4):
+        table = TranspositionTable(1)
+        for p in board.legal_moves():
+            board.play(p)
+            bound = BoundType.LOWER if p % 2 else BoundType.UPPER
+            table.store(board.get_key(), 10, bound, 1000 * (p % 3 - 1), None)
+            board.undo()
+        shared = MinMaxBot(board, NodeLevel.MAX, Difficulty.EASY,
+                           transposition_table=table,
+                           time_limit=float('inf'))
+        fresh = MinMaxBot(board, NodeLevel.MAX, Difficulty.EASY,
+                          transposition_table=TranspositionTable(1),
+                          time_limit=float('inf'))
+        assert shared.h == fresh.h, f"{shared.h} != {fresh.h}\n{board}"
+        assert shared.best_line == fresh.best_line
+
+
+def test_worker_tables_by_algorithm():
+    tables = {
+        get_worker_transposition_table(algorithm, heuristic_type)
+        for algorithm in (Algorithm.MIN_MAX, Algorithm.ALPHA_BETA)
+        for heuristic_type in (HeuristicType.H1, HeuristicType.H2)
+    }
+    assert len(tables) == 4
+    assert get_worker_transposition_table(
+        Algorithm.MIN_MAX) is get_worker_transposition_table(Algorithm.MIN_MAX)
+
+
+# after black fills its last point white has no legal reply, the root move
+# search must score it instead of failing
+def test_search_root_moves_without_reply():
+    board = Board(3)
+    for i, j in ((0, 1), (0, 2), (1, 0), (1, 2), (2, 0), (2, 1)):
+        board.play(board.point(i, j), BLACK)
+    board.turn = BLACK
+    p = board.point(1, 1)
+    results, nodes = search_root_moves(board.get_snapshot(), [p], 3)
+    assert [move for _, move in results] == [p] and nodes > 0
+
+
+# the parallel search is an exact search of the root moves, it must agree
+# with alpha-beta to the same depth
+def test_parallel_search(size=5, depth=2):
+    for board in get_positions(size, games=2, moves=10, step=5):
+        bot = create_bot(board, Algorithm.ALPHA_BETA, Difficulty.EASY,
+                         workers=2, depth=depth)
+        assert isinstance(bot, ParallelSearch)
+        sequential = AlphaBetaBot(board, max_depth=depth,
+                                  time_limit=float('inf'))
+        assert bot.h == sequential.h
+    with pytest.raises(ValueError):
+        create_bot(board, Algorithm.MCTS, Difficulty.EASY, workers=2)
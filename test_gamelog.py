@@ -0,0 +1,77 @@
+import json
+import os
+import gamelog
+from gamelog import GameLogger, read_games
+
+# DIRECTORY :: HELPERS
+
+
+def read_lines(path):
+    with open(path, 'r') as f:
+        return [json.loads(line) for line in f]
+
+
+def log_game(logger, moves, result='B+1'):
+    logger.start_game(5, game_type='AVA')
+    for index, move in enumerate(moves):
+        logger.add_move(1 + index % 2, move)
+    logger.end_game(result)
+
+
+# DIRECTORY :: LOG
+
+
+# the buffer reaches the file once the interval went by, on a write or on
+# maybe_flush alone while no move is logged
+def test_flush_interval(tmp_path, monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(gamelog.time, 'monotonic', lambda: now[0])
+    path = tmp_path / 'games.jsonl'
+    logger = GameLogger(path, flush_interval=5.0)
+    logger.start_game(5)
+    logger.add_move(1, (0, 0))
+    assert read_lines(path) == []
+
+    now[0] += 4.0
+    logger.maybe_flush()
+    assert read_lines(path) == []
+    now[0] += 1.0
+    logger.maybe_flush()
+    assert len(read_lines(path)) == 2
+
+    logger.add_move(2, None)
+    logger.end_game('W+R')  # always flushed
+    assert read_lines(path)[-1]['result'] == 'W+R'
+    logger.close()
+
+
+def test_rotation(tmp_path):
+    path = str(tmp_path / 'games.jsonl')
+    logger = GameLogger(path, max_bytes=400, backups=2)
+    for index in range(12):
+        log_game(logger, [(index % 5, 0), None], result=f"B+{index}")
+    logger.close()
+    assert os.path.exists(f"{path}.1") and os.path.exists(f"{path}.2")
+    assert not os.path.exists(f"{path}.3")
+    for log_path in (path, f"{path}.1", f"{path}.2"):
+        assert os.path.getsize(log_path) < 400 + 200
+
+
+# a game that goes on across rotated files is read back whole, a game whose
+# start is in a file that isn't read is skipped
+def test_read_across_rotation(tmp_path):
+    path = str(tmp_path / 'games.jsonl')
+    logger = GameLogger(path, max_bytes=250, backups=5)
+    moves = [(i, j) for i in range(3) for j in range(3)] + [None]
+    log_game(logger, moves[:2], result='B+2')
+    log_game(logger, moves, result='W+5')
+    logger.close()
+    assert os.path.exists(f"{path}.3")
+
+    games = list(read_games(path, backups=5))
+    assert [end['result'] for _, _, _, end in games] == ['B+2', 'W+5']
+    assert games[1][1:3] == (5, [(1 + k % 2, move)
+                                 for k, move in enumerate(moves)])
+    for backups in range(3):
+        for _, _, game_moves, end in read_games(path, backups):
+            assert end['moves'] == len(game_moves)
@@ -0,0 +1,99 @@
+import os
+import random
+import subprocess
+import sys
+import pytest
+from engine import BLACK, PASS, WHITE, Board
+from replay import (ReplayError, read_expected, record_expected, replay_game,
+                    replay_games)
+from sgf import GameRecord, save_games
+
+# DIRECTORY :: HELPERS
+
+
+# a random legal game with its captures, kept as a record
+def get_record(size=7, moves=80, seed=0):
+    rng = random.Random(seed)
+    board = Board(size)
+    record = GameRecord(size)
+    for _ in range(moves):
+        legal_moves = board.legal_moves()
+        p = rng.choice(legal_moves) if legal_moves else PASS
+        record.add_move(board.turn, None if p == PASS else board.coords(p))
+        board.play(p)
+    return record
+
+
+# DIRECTORY :: REPLAY
+
+
+def test_checkpoints(every=10):
+    record = get_record()
+    result = replay_game(record, every=every)
+    assert [c['move'] for c in result['checkpoints']
+            ] == list(range(every, len(record.moves) + 1, every))
+    assert sum(result['score']) <= record.size * record.size
+
+    # the same checkpoints and score are expected again
+    again = replay_game(record, result['checkpoints'], result['score'])
+    assert again == result
+
+
+def test_checkpoint_mismatch():
+    record = get_record()
+    checkpoint = dict(replay_game(record, every=20)['checkpoints'][1])
+    board = list(checkpoint['board'])
+    board[0] = 'X' if board[0] != 'X' else 'O'
+    checkpoint['board'] = ''.join(board)
+    with pytest.raises(ReplayError, match="move 40"):
+        replay_game(record, [checkpoint])
+
+    score = replay_game(record)['score']
+    with pytest.raises(ReplayError, match="score"):
+        replay_game(record, score=[score[0] + 1, score[1]])
+
+
+def test_illegal_move():
+    record = GameRecord(5)
+    record.add_move(BLACK, (2, 2))
+    record.add_move(WHITE, (2, 2))
+    with pytest.raises(ReplayError, match="move 2"):
+        replay_game(record)
+
+
+# every record against its expected line, a wrong or missing line is a
+# failure of that game and the others still replay
+def test_expected_lines(tmp_path):
+    records = [get_record(seed=seed) for seed in range(3)]
+    path = tmp_path / 'expected.jsonl'
+    list(record_expected(records, path, every=20))
+    lines = list(read_expected(path))
+    assert [line['game'] for line in lines] == [0, 1, 2]
+
+    results, failures = replay_games(records, iter(lines))
+    assert len(results) == 3 and failures == []
+
+    lines[1]['score'] = [0, 0]
+    results, failures = replay_games(records, iter(lines[:2]))
+    assert len(results) == 1
+    assert failures[0][0] == 1 and "score" in failures[0][1]
+    assert failures[1] == (2, "no expected line")
+
+
+def test_command_fails_on_mismatch(tmp_path):
+    records = [get_record(seed=seed) for seed in range(2)]
+    games = tmp_path / 'games.sgf'
+    save_games(games, records)
+    expected = tmp_path / 'expected.jsonl'
+    script = os.path.join(os.path.dirname(__file__), 'replay.py')
+    command = [sys.executable, script, str(games)]
+    subprocess.run(command + ['--record', str(expected)], check=True)
+    run = subprocess.run(command + ['--expected', str(expected)])
+    assert run.returncode == 0
+
+    lines = expected.read_text().splitlines()
+    expected.write_text(lines[1] + '\n' + lines[0] + '\n')
+    run = subprocess.run(command + ['--expected', str(expected)],
+                         capture_output=True,
+                         text=True)
+    assert run.returncode == 1 and "game 0:" in run.stdout
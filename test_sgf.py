@@ -0,0 +1,88 @@
+import io
+import random
+import pytest
+from engine import BLACK, WHITE
+from sgf import GameRecord, get_game_str, read_games, write_games
+
+# DIRECTORY :: HELPERS
+
+
+# records with setup stones, passes, escaped text and a result
+def get_records(count=20, size=9, seed=0):
+    rng = random.Random(seed)
+    records = []
+    for index in range(count):
+        points = rng.sample([(i, j) for i in range(size) for j in range(size)],
+                            12)
+        record = GameRecord(size,
+                            result=rng.choice(['B+3', 'W+R', '0', None]),
+                            komi=rng.choice([0.0, 6.5]),
+                            setup=[(BLACK, p) for p in points[:3]] +
+                            [(WHITE, p) for p in points[3:5]],
+                            properties={
+                                'GN': [f"game {index}"],
+                                'C':
+                                ["a ] bracket, a \\ backslash\nand a line"],
+                            })
+        color = BLACK
+        for p in points[5:] + [None]:
+            record.add_move(color, p)
+            color = WHITE if color == BLACK else BLACK
+        records.append(record)
+    return records
+
+
+def read_text(text, chunk_size):
+    return list(read_games(io.StringIO(text), chunk_size))
+
+
+# DIRECTORY :: READER
+
+
+# a property with several values can be split anywhere across chunks
+def test_values_across_chunks():
+    text = "(;GM[1]SZ[9]AB[aa][bb][cc]AW[dd][ee];B[ff];W[gg])"
+    for chunk_size in range(1, len(text) + 2):
+        record, = read_text(text, chunk_size)
+        assert [color for color, _ in record.setup] == [BLACK] * 3 + [WHITE] * 2
+        assert record.setup[1] == (BLACK, (7, 1))
+        assert record.moves == [(BLACK, (3, 5)), (WHITE, (2, 6))]
+
+
+def test_round_trip(chunk_sizes=(1, 2, 3, 5, 7, 16, 64, 1 << 16)):
+    records = get_records()
+    f = io.StringIO()
+    write_games(f, records)
+    text = f.getvalue()
+    for chunk_size in chunk_sizes:
+        read = read_text(text, chunk_size)
+        assert [get_game_str(record) for record in read
+                ] == [get_game_str(record) for record in records]
+        assert read[0].properties['C'] == records[0].properties['C']
+        assert read[0].setup == records[0].setup
+
+
+# only the main line of the variations is kept, escaped brackets and soft
+# line breaks stay in their value
+def test_variations_and_escapes():
+    text = ("(;GM[1]SZ[5]C[one \\] two\\\nthree]"
+            "(;B[aa](;W[bb];B[cc])(;W[dd]))(;B[ee]))\n"
+            "(;GM[1]SZ[5];W[])")
+    for chunk_size in (1, 2, 4, 9, 1 << 16):
+        first, second = read_text(text, chunk_size)
+        assert first.properties['C'] == ["one ] twothree"]
+        assert first.moves == [(BLACK, (4, 0)), (WHITE, (3, 1)),
+                               (BLACK, (2, 2))]
+        assert second.moves == [(WHITE, None)]
+
+
+@pytest.mark.parametrize('text', [
+    "(;GM[1]SZ[9];B[aa]",
+    "(;GM[1]SZ[9];B[aa]))",
+    "(;GM[2]SZ[9];B[aa])",
+    ";B[aa]",
+    "(;GM[1]SZ[9];B[zz])",
+])
+def test_bad_files(text):
+    with pytest.raises(ValueError):
+        read_text(text, 4)
@@ -0,0 +1,206 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import argparse
+import json
+import math
+import multiprocessing
+import random
+import time
+from engine import (Algorithm, Board, Difficulty, TranspositionTable,
+                    create_bot, get_opponent)
+
+# DIRECTORY :: BOTS
+
+
+# "algorithm:difficulty[:option=value...]", e.g. "alpha-beta:medium" or
+# "mcts:easy:playouts=500", options are passed to the bot constructor
+def parse_bot(spec):
+    fields = spec.split(':')
+    algorithm = Algorithm[fields[0].upper().replace('-', '_')]
+    difficulty = Difficulty[fields[1].upper()] if len(
+        fields) > 1 else Difficulty.EASY
+    options = {}
+    for field in fields[2:]:
+        key, value = field.split('=')
+        for parse in (int, float, str):
+            try:
+                options[key] = parse(value)
+                break
+            except ValueError:
+                pass
+    return algorithm, difficulty, options
+
+
+# DIRECTORY :: GAMES
+
+
+# one game in a worker process, `bots` maps the names A and B to their spec,
+# A plays black in the even games, the seed picks the random opening moves
+# and seeds the bots that take one
+def play_game(index, seed, bots, rows, moves, opening):
+    rng = random.Random(seed)
+    board = Board(rows + 1)
+    names = ('A', 'B') if index % 2 == 0 else ('B', 'A')
+    colors = {board.turn: names[0], get_opponent(board.turn): names[1]}
+    configs = {name: parse_bot(spec) for name, spec in bots.items()}
+    tables = {
+        name: TranspositionTable()
+        for name, (algorithm, _, _) in configs.items()
+        if algorithm != Algorithm.MCTS
+    }
+    think_time = {'A': 0.0, 'B': 0.0}
+    bot_moves = {'A': 0, 'B': 0}
+
+    played = 0
+    start = time.perf_counter()
+    while played < moves:
+        if played < opening:
+            legal_moves = board.legal_moves()
+            if not legal_moves:
+                break
+            board.play(rng.choice(legal_moves))
+            played += 1
+            continue
+
+        name = colors[board.turn]
+        algorithm, difficulty, options = configs[name]
+        if algorithm == Algorithm.MCTS:
+            options = {'seed': rng.getrandbits(32), **options}
+        move_start = time.perf_counter()
+        bot = create_bot(board, algorithm, difficulty,
+                         transposition_table=tables.get(name), **options)
+        move = bot.get_move()
+        think_time[name] += time.perf_counter() - move_start
+        if move is None:
+            break
+        board.play(board.point(*move))
+        bot_moves[name] += 1
+        played += 1
+
+    scores = board.score()
+    score = {name: scores[color] + board.captures[color]
+             for color, name in colors.items()}
+    winner = None
+    if score['A'] != score['B']:
+        winner = 'A' if score['A'] > score['B'] else 'B'
+    return {
+        'game': index,
+        'seed': seed,
+        'black': names[0],
+        'white': names[1],
+        'winner': winner,
+        'score': score,
+        'moves': played,
+        'bot_moves': bot_moves,
+        'think_time': think_time,
+        'time': time.perf_counter() - start,
+    }
+
+
+# DIRECTORY :: STATS
+
+
+def get_elo(score):
+    if score <= 0:
+        return -math.inf
+    if score >= 1:
+        return math.inf
+    return 400 * math.log10(score / (1 - score))
+
+
+# 95% wilson interval of a rate seen over n games, sane at 0 and 1
+def get_interval(rate, n, z=1.96):
+    center = (rate + z * z / (2 * n)) / (1 + z * z / n)
+    margin = z * math.sqrt(rate * (1 - rate) / n + z * z /
+                           (4 * n * n)) / (1 + z * z / n)
+    return max(center - margin, 0.0), min(center + margin, 1.0)
+
+
+# win rates, score of A (a draw counts half) and the Elo difference of A over
+# B, all with 95% intervals
+def get_summary(results, elapsed):
+    n = len(results)
+    draws = sum(r['winner'] is None for r in results)
+    summary = {
+        'games': n,
+        'wins': {},
+        'win_rate': {},
+        'win_rate_interval': {},
+        'draws': draws,
+        'games_per_second': n / elapsed,
+        'time_per_move': {},
+    }
+    for name in ('A', 'B'):
+        wins = sum(r['winner'] == name for r in results)
+        summary['wins'][name] = wins
+        summary['win_rate'][name] = wins / n
+        summary['win_rate_interval'][name] = get_interval(wins / n, n)
+    score = (summary['wins']['A'] + 0.5 * draws) / n
+    summary['score'] = score
+    summary['score_interval'] = get_interval(score, n)
+    summary['elo'] = get_elo(score)
+    summary['elo_interval'] = tuple(map(get_elo, summary['score_interval']))
+    for name in ('A', 'B'):
+        bot_moves = sum(r['bot_moves'][name] for r in results)
+        think_time = sum(r['think_time'][name] for r in results)
+        summary['time_per_move'][name] = think_time / max(bot_moves, 1)
+    return summary
+
+
+def print_summary(bots, summary):
+    print(f"A = {bots['A']}, B = {bots['B']}, {summary['games']} games")
+    for name in ('A', 'B'):
+        low, high = summary['win_rate_interval'][name]
+        print(f"{name} wins {summary['wins'][name]} "
+              f"({summary['win_rate'][name]:.0%}, 95% {low:.0%} - {high:.0%})")
+    print(f"draws {summary['draws']}")
+    low, high = summary['score_interval']
+    print(f"A score {summary['score']:.3f} (95% {low:.3f} - {high:.3f})")
+    low, high = summary['elo_interval']
+    print(f"Elo A - B {summary['elo']:+.0f} (95% {low:+.0f} - {high:+.0f})")
+    print(f"{summary['games_per_second']:.2f} games/s, time per move "
+          f"A {summary['time_per_move']['A']:.3f} s, "
+          f"B {summary['time_per_move']['B']:.3f} s")
+
+
+def run_tournament(bots, games, rows, moves, opening, seed, workers, output):
+    results = []
+    start = time.perf_counter()
+    with open(output, 'w') as f, ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('spawn')) as executor:
+        futures = [
+            executor.submit(play_game, index, seed + index, bots, rows, moves,
+                            opening) for index in range(games)
+        ]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            f.write(json.dumps(result) + '\n')
+            f.flush()
+    return get_summary(results, time.perf_counter() - start)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description="Plays bot A against bot B without a window.")
+    parser.add_argument('bot_a', help="e.g. alpha-beta:medium")
+    parser.add_argument('bot_b', help="e.g. mcts:easy:playouts=500")
+    parser.add_argument('--games', type=int, default=20)
+    parser.add_argument('--rows', type=int, default=7, help="table rows")
+    parser.add_argument('--moves', type=int, default=50, help="move limit")
+    parser.add_argument('--opening',
+                        type=int,
+                        default=4,
+                        help="random moves before the bots play")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--output', default='tournament.jsonl')
+    args = parser.parse_args()
+
+    bots = {'A': args.bot_a, 'B': args.bot_b}
+    for spec in bots.values():
+        parse_bot(spec)  # fail before starting the workers
+    summary = run_tournament(bots, args.games, args.rows, args.moves,
+                             args.opening, args.seed, args.workers,
+                             args.output)
+    print_summary(bots, summary)